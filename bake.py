@@ -0,0 +1,126 @@
+# Запекание ресурсов: все спрайты из assets/ уменьшаются до игровых размеров,
+# портреты обрезаются по кругу, и всё складывается в один атлас с индексом.
+# Фон сохраняется отдельно уже под размер окна. main.py берет пакет, если он есть.
+#
+#   python bake.py                 # assets/sprites.png, sprites.json, sprites_background.jpg
+#   python bake.py --output build  # в другую папку
+#
+# Сборка для браузера: в папку кладется main.py и только то, что нужно игре
+# в вебе — пакет спрайтов, achievements.json и облегченная музыка для pygbag.
+# Исходные картинки и настольный ogg в загрузку не попадают:
+#
+#   python bake.py --web web_bundle && pygbag web_bundle
+import argparse
+import json
+import os
+import shutil
+import sys
+
+# Окно не нужно, но convert и маски требуют инициализированный pygame
+os.environ["STRAT_HEADLESS"] = "1"
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import pygame
+
+from main import (ACHIEVEMENTS_FILE, SPRITE_FILES, FACE_SPRITES, face_cache, load_background,
+                  load_enemies, load_scaled)
+
+# Файлы, которые веб-сборка берет как есть, кроме пакета спрайтов
+WEB_FILES = ["main.py", ACHIEVEMENTS_FILE, "assets/new_year-pygbag.ogg"]
+
+PADDING = 2
+MAX_ATLAS_WIDTH = 1024
+
+
+def collect_sprites():
+    sprites = {}
+    for name, (path, size) in SPRITE_FILES.items():
+        try:
+            image = load_scaled(path, size)().convert_alpha()
+        except Exception as e:
+            print(f"Пропускаю {name}: {e}")
+            continue
+        if name in FACE_SPRITES:
+            image = face_cache.get(image, size[0])
+        sprites[name] = [image]
+
+    enemies = load_enemies()
+    if enemies:
+        sprites["enemies"] = [image.convert_alpha() for image in enemies]
+    return sprites
+
+
+# Простая упаковка полками: спрайты по убыванию высоты, слева направо,
+# новая полка — когда не влезает по ширине
+def pack(sprites):
+    items = [(name, i, image) for name, images in sprites.items() for i, image in enumerate(images)]
+    items.sort(key=lambda item: item[2].get_height(), reverse=True)
+
+    placements = {name: [None] * len(images) for name, images in sprites.items()}
+    x = y = shelf_height = atlas_width = 0
+    for name, i, image in items:
+        width, height = image.get_size()
+        if x and x + width > MAX_ATLAS_WIDTH:
+            x = 0
+            y += shelf_height + PADDING
+            shelf_height = 0
+        placements[name][i] = [x, y, width, height]
+        x += width + PADDING
+        shelf_height = max(shelf_height, height)
+        atlas_width = max(atlas_width, x)
+
+    atlas = pygame.Surface((max(atlas_width, 1), max(y + shelf_height, 1)), pygame.SRCALPHA)
+    for name, i, image in items:
+        atlas.blit(image, placements[name][i][:2])
+    return atlas, placements
+
+
+def bake(output):
+    os.makedirs(output, exist_ok=True)
+    atlas, placements = pack(collect_sprites())
+    index = {"version": 1, "sprites": placements, "files": {}}
+
+    pygame.image.save(atlas, os.path.join(output, "sprites.png"))
+    print(f"Атлас {atlas.get_width()}x{atlas.get_height()}: {sum(map(len, placements.values()))} спрайтов")
+
+    try:
+        background = load_background()
+        pygame.image.save(background, os.path.join(output, "sprites_background.jpg"))
+        index["files"]["background"] = "sprites_background.jpg"
+    except Exception as e:
+        print(f"Пропускаю фон: {e}")
+
+    with open(os.path.join(output, "sprites.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+
+def folder_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+# Папка для pygbag: пакет запекается прямо в её assets/, остальное копируется
+def bake_web(output):
+    bake(os.path.join(output, "assets"))
+    for path in WEB_FILES:
+        target = os.path.join(output, path)
+        os.makedirs(os.path.dirname(target) or output, exist_ok=True)
+        shutil.copy2(path, target)
+    print(f"Веб-сборка {output}: {folder_size(output) / 1e6:.1f} МБ "
+          f"(исходная папка assets: {folder_size('assets') / 1e6:.1f} МБ)")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Запекание спрайтов в один атлас")
+    parser.add_argument("--output", default="assets", help="папка для атласа и индекса")
+    parser.add_argument("--web", metavar="DIR", help="собрать папку для pygbag без исходных картинок")
+    args = parser.parse_args(argv)
+    if args.web:
+        bake_web(args.web)
+    else:
+        bake(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
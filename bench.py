@@ -0,0 +1,334 @@
+# Бенчмарк сцен main.py: фиксированные сидированные сценарии без окна,
+# время update и draw меряется отдельно и выводится в JSON.
+#
+#   python bench.py                                  # все сценарии, JSON в stdout
+#   python bench.py --output bench.json              # сохранить результат
+#   python bench.py --baseline bench.json            # сравнить с прошлой сборкой
+#   python bench.py --scenario play --frames 600
+#   python bench.py --text-layout                    # микробенчмарк переноса текста
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+# Окно не нужно: main.py читает флаг до инициализации pygame
+os.environ["STRAT_HEADLESS"] = "1"
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import numpy as np
+import pygame
+
+from main import (AchievementObstacle, Game, GameState, FrameClock, POPUP_TEXT_WIDTH,
+                  achievements_data, assets, font_medium, text_layout)
+
+SPACE = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+ENTER = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN)
+
+
+def new_game(seed, state, endless=False):
+    game = Game(rng=np.random.default_rng(seed), clock=FrameClock(), endless=endless)
+    game.state = state
+    return game
+
+
+# Каждый сценарий возвращает игру и функцию событий для кадра
+def scenario_menu(seed):
+    return new_game(seed, GameState.MENU), lambda game, frame: []
+
+
+# Обычная игра: прыжки каждые 40 кадров, ENTER после каждого достижения,
+# так проходятся все achievements_data до финиша (сценарий идет до FINISHED)
+def scenario_play(seed):
+    def events(game, frame):
+        result = []
+        if frame % 40 == 0:
+            result.append(SPACE)
+        if game.state == GameState.ACHIEVEMENT_WAIT:
+            result.append(ENTER)
+        return result
+
+    return new_game(seed, GameState.PLAYING), events
+
+
+# Шторм частиц: праздничный салют каждые 2 кадра поверх обычной игры
+def scenario_particle_storm(seed):
+    def events(game, frame):
+        if frame % 2 == 0:
+            game.create_celebration_particles()
+        return [SPACE] if frame % 40 == 0 else []
+
+    game = new_game(seed, GameState.PLAYING)
+    game.spawn_timer = 10 ** 9
+    return game, events
+
+
+# Толпа препятствий для широкой фазы столкновений: CROWD_SIZE достижений
+# разложены по всей полосе и доливаются каждый кадр. Попап после сбора сразу
+# закрывается — его меряет popup_wait
+CROWD_SIZE = 400
+
+
+def scenario_obstacle_crowd(seed):
+    def refill(game):
+        while len(game.obstacles) < CROWD_SIZE:
+            achievement = achievements_data[len(game.obstacles) % len(achievements_data)]
+            offset = int(game.rng.integers(-900, 1200))
+            game.obstacles.append(AchievementObstacle(achievement, offset, rng=game.rng))
+
+    def events(game, frame):
+        game.state = GameState.PLAYING
+        game.achievement_display = None
+        refill(game)
+        return [SPACE] if frame % 40 == 0 else []
+
+    game = new_game(seed, GameState.PLAYING)
+    game.spawn_timer = 10 ** 9
+    return game, events
+
+
+# Бесконечный режим как долгий прогон: рост drift_ms и objects_delta
+# на большом --frames говорит об утечке или деградации кадра
+def scenario_endless(seed):
+    return new_game(seed, GameState.PLAYING, endless=True), \
+        lambda game, frame: [SPACE] if frame % 40 == 0 else []
+
+
+def scenario_popup_wait(seed):
+    game = new_game(seed, GameState.ACHIEVEMENT_WAIT)
+    game.show_achievement(achievements_data[0], "collected")
+    game.dev1.collected.append(achievements_data[0])
+    return game, lambda game, frame: []
+
+
+def scenario_finish(seed):
+    game = new_game(seed, GameState.FINISHED)
+    for i, achievement in enumerate(achievements_data):
+        developer = game.dev1 if i % 2 == 0 else game.dev2
+        developer.collected.append(achievement)
+        game.collected_achievements.append({
+            "achievement": achievement,
+            "collected_by": developer.name,
+            "method": "collected" if i % 3 else "jumped"
+        })
+    return game, lambda game, frame: []
+
+
+SCENARIOS = {
+    "menu": scenario_menu,
+    "play": scenario_play,
+    "particle_storm": scenario_particle_storm,
+    "obstacle_crowd": scenario_obstacle_crowd,
+    "endless": scenario_endless,
+    "popup_wait": scenario_popup_wait,
+    "finish": scenario_finish,
+}
+
+# Сколько кадров мерить по умолчанию; None — до FINISHED, но не больше MAX_FRAMES
+DEFAULT_FRAMES = 600
+SCENARIO_FRAMES = {"play": None}
+MAX_FRAMES = 10000
+
+
+def percentiles(samples):
+    values = np.array(samples) * 1000
+    return {
+        "mean": round(float(values.mean()), 4),
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p90": round(float(np.percentile(values, 90)), 4),
+        "p99": round(float(np.percentile(values, 99)), 4),
+        "max": round(float(values.max()), 4),
+    }
+
+
+def run_scenario(name, frames, seed, warmup):
+    game, events = SCENARIOS[name](seed)
+    update_times = []
+    draw_times = []
+    objects_before = None
+    until_finished = frames is None
+
+    for frame in range(warmup + (MAX_FRAMES if until_finished else frames)):
+        if until_finished and game.state == GameState.FINISHED:
+            break
+        for event in events(game, frame):
+            game.handle_event(event)
+
+        start = time.perf_counter()
+        game.update()
+        middle = time.perf_counter()
+        game.draw()
+        end = time.perf_counter()
+
+        if frame == warmup:
+            objects_before = len(gc.get_objects())
+        if frame >= warmup:
+            update_times.append(middle - start)
+            draw_times.append(end - middle)
+
+    if not update_times:
+        raise ValueError(f"{name}: не измерено ни одного кадра — игра закончилась "
+                         f"за {frame} кадров прогрева, уменьшите --warmup")
+
+    # Дрейф — разница среднего времени кадра последней и первой четверти замеров
+    totals = np.array(update_times) + np.array(draw_times)
+    quarter = max(1, len(totals) // 4)
+    return {
+        "frames": len(update_times),
+        "collected": len(game.collected_achievements),
+        "update_ms": percentiles(update_times),
+        "draw_ms": percentiles(draw_times),
+        "drift_ms": round(float(totals[-quarter:].mean() - totals[:quarter].mean()) * 1000, 4),
+        "objects_delta": len(gc.get_objects()) - objects_before,
+    }
+
+
+# Регрессия — когда p50 или p90 выросли больше чем на threshold относительно базы.
+# Совсем короткие фазы (меньше min_ms) не сравниваются: там шум больше сигнала
+def compare(results, baseline, threshold, min_ms=0.05):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for phase in ("update_ms", "draw_ms"):
+            for stat in ("p50", "p90"):
+                old = base[phase][stat]
+                new = result[phase][stat]
+                if old >= min_ms and new > old * (1 + threshold):
+                    regressions.append({
+                        "scenario": name,
+                        "phase": phase,
+                        "stat": stat,
+                        "baseline": old,
+                        "current": new,
+                        "change": round(new / old - 1, 4),
+                    })
+        # Прогон, который прошел меньше игры, чем база, сравнивает не то же самое
+        if result["collected"] < base.get("collected", 0):
+            regressions.append({
+                "scenario": name,
+                "phase": "coverage",
+                "stat": "collected",
+                "baseline": base["collected"],
+                "current": result["collected"],
+            })
+    return regressions
+
+
+# Прежний перенос из main.py для сравнения: ширина всей строки меряется
+# заново после каждого слова, поэтому время растет квадратично от длины строки
+def wrap_text_naive(text, font, max_width):
+    words = text.split(' ')
+    lines = []
+    current_line = []
+
+    for word in words:
+        current_line.append(word)
+        line_width = font.size(' '.join(current_line))[0]
+
+        if line_width > max_width:
+            if len(current_line) == 1:
+                lines.append(' '.join(current_line))
+                current_line = []
+            else:
+                current_line.pop()
+                lines.append(' '.join(current_line))
+                current_line = [word]
+
+    if current_line:
+        lines.append(' '.join(current_line))
+
+    return lines
+
+
+def time_per_call(function, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            function(text, font_medium, POPUP_TEXT_WIDTH)
+    return round((time.perf_counter() - start) / (repeat * len(texts)) * 1000, 4)
+
+
+# Тексты достижений как есть и склеенные в длинные абзацы (x10): прежний
+# перенос, новый без кэша (холодные ширины слов) и повторный вызов из кэша
+def bench_text_layout(repeat=50):
+    report = {}
+    for name, scale in (("achievements", 1), ("long", 10)):
+        texts = [" ".join([entry["text"]] * scale) for entry in achievements_data]
+
+        def cold(text, font, max_width):
+            text_layout.widths.clear()
+            return text_layout.layout(text, font, max_width)
+
+        text_layout.clear()
+        report[name] = {
+            "naive_ms": time_per_call(wrap_text_naive, texts, repeat),
+            "linear_ms": time_per_call(cold, texts, repeat),
+            "cached_ms": time_per_call(text_layout.wrap, texts, repeat),
+        }
+    return report
+
+
+def frames_for(name, frames):
+    if frames is not None:
+        return frames
+    return SCENARIO_FRAMES.get(name, DEFAULT_FRAMES)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк сцен main.py")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="сценарий (можно несколько раз), по умолчанию все")
+    parser.add_argument("--frames", type=int,
+                        help=f"кадров на сценарий, по умолчанию {DEFAULT_FRAMES} (play — до финиша)")
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="куда сохранить JSON с результатом")
+    parser.add_argument("--baseline", help="JSON прошлой сборки для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="допустимый рост p50/p90, по умолчанию 10%%")
+    parser.add_argument("--text-layout", action="store_true",
+                        help="только микробенчмарк переноса текста")
+    args = parser.parse_args(argv)
+
+    if args.text_layout:
+        print(json.dumps(bench_text_layout(), ensure_ascii=False, indent=2))
+        return 0
+
+    if args.frames is not None and args.frames < 1:
+        parser.error("--frames должно быть не меньше 1")
+    if args.warmup < 0:
+        parser.error("--warmup не может быть отрицательным")
+
+    assets.load_all()
+    names = args.scenario or list(SCENARIOS)
+    try:
+        scenarios = {name: run_scenario(name, frames_for(name, args.frames), args.seed, args.warmup)
+                     for name in names}
+    except ValueError as e:
+        parser.error(str(e))
+    report = {
+        "seed": args.seed,
+        "pygame": pygame.version.ver,
+        "scenarios": scenarios,
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["threshold"] = args.threshold
+        report["regressions"] = compare(report["scenarios"], baseline, args.threshold)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
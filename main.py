@@ -1,10 +1,28 @@
-import pygame
-import random
+import bisect
+import functools
+import gc
+import json
+import os
+import queue
 import sys
 import math
+import threading
+import time
 import asyncio  # Только это добавлено для PygBag
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from enum import Enum
 
+# Безголовый режим: без окна и звука (SDL dummy), для прогонов симуляции и бенчмарков.
+# Драйверы нужно выставить до инициализации pygame
+HEADLESS = os.environ.get("STRAT_HEADLESS") == "1" or "--headless" in sys.argv
+if HEADLESS:
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import numpy as np
+import pygame
+
 # Инициализация PyGame
 pygame.init()
 pygame.mixer.init()
@@ -14,70 +32,260 @@ pygame.display.set_caption("Новогодняя Backend Odyssey 2025: Год п
 clock = pygame.time.Clock()
 emoji_surfaces = {}
 
-# Фоновая новогодняя музыка
-try:
-    pygame.mixer.music.load("assets/new_year.ogg")
-    pygame.mixer.music.set_volume(0.2)
-    pygame.mixer.music.play(-1)
-    music_playing = True
-except:
-    print("Не удалось загрузить фоновую музыку (new_year.ogg)")
-    music_playing = False
+# В браузере (pygbag) потоков нет — фоновая загрузка идет асинхронными задачами
+WEB = sys.platform == "emscripten"
+
+
+# Загрузка ресурсов в фоне: чтение и масштабирование картинок идут в рабочем потоке
+# (под pygbag — задачей asyncio), а convert и запуск музыки — в главном потоке в poll().
+# Пока ресурс не готов, get() отдает заглушку, поэтому первый кадр рисуется сразу
+# Все, что создано к концу загрузки (модули, шрифты, ресурсы, achievements_data,
+# кэши), живет до выхода. gc.freeze убирает это из поколений сборщика, и сборки
+# во время игры обходят только то, что появилось потом
+def freeze_startup_objects():
+    gc.collect()
+    gc.freeze()
+
+
+class AssetManager:
+    def __init__(self):
+        self.jobs = []
+        self.assets = {}
+        self.placeholders = {}
+        self.finished = queue.Queue()
+        self.loaded = 0
+        self.version = 0
+        self.started = False
+        self.frozen = False
+
+    # load выполняется в фоне, finalize — в главном потоке
+    def add(self, name, load, finalize=None, placeholder=None):
+        self.jobs.append((name, load, finalize))
+        self.placeholders[name] = placeholder
+
+    def get(self, name):
+        return self.assets.get(name, self.placeholders.get(name))
+
+    @property
+    def total(self):
+        return len(self.jobs)
+
+    @property
+    def ready(self):
+        return self.loaded >= len(self.jobs)
+
+    @property
+    def progress(self):
+        return self.loaded / len(self.jobs) if self.jobs else 1.0
+
+    def run_job(self, name, load, finalize):
+        try:
+            value = load()
+        except Exception as e:
+            print(f"Не удалось загрузить {name}: {e}")
+            value = None
+        self.finished.put((name, value, finalize))
+
+    def worker(self):
+        for job in self.jobs:
+            self.run_job(*job)
+
+    async def worker_async(self):
+        for job in self.jobs:
+            self.run_job(*job)
+            await asyncio.sleep(0)
+
+    def start(self):
+        if self.started:
+            return
+        self.started = True
+        if WEB:
+            asyncio.get_event_loop().create_task(self.worker_async())
+        else:
+            threading.Thread(target=self.worker, daemon=True).start()
+
+    def poll(self):
+        while True:
+            try:
+                name, value, finalize = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            if value is not None and finalize:
+                try:
+                    value = finalize(value)
+                except Exception as e:
+                    print(f"Не удалось загрузить {name}: {e}")
+                    value = None
+            if value is not None:
+                self.assets[name] = value
+            self.loaded += 1
+            self.version += 1
+
+        # Последний ресурс готов — стартовые объекты больше не нужно обходить сборщиком
+        if self.ready and self.started and not self.frozen:
+            self.frozen = True
+            freeze_startup_objects()
+
+    # Синхронная загрузка всего сразу (безголовый режим, бенчмарки)
+    def load_all(self):
+        self.started = True
+        self.worker()
+        self.poll()
+
+
+def load_background():
+    image = pygame.image.load("assets/fon.jpg")
+    bg_width, bg_height = image.get_size()
+    scale = min(WIDTH / bg_width, HEIGHT / bg_height)
+    return pygame.transform.scale(image, (int(bg_width * scale), int(bg_height * scale)))
 
-# Загрузка изображений
-try:
-    background_image = pygame.image.load("assets/fon.jpg")
-    bg_width, bg_height = background_image.get_size()
-    scale_x = WIDTH / bg_width
-    scale_y = HEIGHT / bg_height
-    scale = min(scale_x, scale_y)
-    new_width = int(bg_width * scale)
-    new_height = int(bg_height * scale)
-    background_image = pygame.transform.scale(background_image, (new_width, new_height))
-except:
-    background_image = None
-    print("Не удалось загрузить fon.jpg")
 
-enemy_images = []
 # Список имен ваших файлов (проверьте, чтобы названия в папке assets были такими же!)
 enemy_filenames = ["assets/grinch2.png", "assets/nastya.jpg", "assets/german.jpg", "assets/kolya.jpg"]
 
 
-for filename in enemy_filenames:
-    try:
-        img = pygame.image.load(filename).convert_alpha()
-        img = pygame.transform.scale(img, (80, 80))  # под размер obstacle
-        enemy_images.append(img)
-    except Exception as e:
-        print(f"Не удалось загрузить {filename}: {e}")
+def load_enemies():
+    images = []
+    for filename in enemy_filenames:
+        try:
+            img = pygame.image.load(filename)
+            images.append(pygame.transform.scale(img, (80, 80)))  # под размер obstacle
+        except Exception as e:
+            print(f"Не удалось загрузить {filename}: {e}")
+    return images or None
 
-# Если ни одна картинка не загрузилась, создаем красный квадрат, чтобы игра не вылетела
-if not enemy_images:
-    fallback = pygame.Surface((80, 80))
-    fallback.fill((255, 0, 0))
-    enemy_images.append(fallback)
 
+def load_scaled(path, size):
+    return lambda: pygame.transform.scale(pygame.image.load(path), size)
 
-try:
-    alina_image = pygame.image.load("assets/alina.png")
-    alina_image = pygame.transform.scale(alina_image, (45, 45))
-except:
-    alina_image = None
-    print("Не удалось загрузить alina.png")
 
-try:
-    snowflake_image = pygame.image.load("assets/snow.png").convert_alpha()
-    snowflake_image = pygame.transform.scale(snowflake_image, (20, 20))
-except:
-    snowflake_image = None
-    print("Не удалось загрузить snow.png")
+# Одиночные спрайты: исходный файл и размер, под который он сразу уменьшается.
+# Портреты в запеченном пакете уже обрезаны по кругу
+SPRITE_FILES = {
+    "alina": ("assets/alina.png", (45, 45)),
+    "snowflake": ("assets/snow.png", (20, 20)),
+    "artem": ("assets/artem.png", (45, 45)),
+}
+FACE_SPRITES = ["alina", "artem"]
+
+
+# Запеченный пакет спрайтов (см. bake.py): один атлас уже уменьшенных картинок,
+# индекс с их прямоугольниками и отдельный фон нужного размера.
+# Если пакета нет, ресурсы читаются из исходных файлов
+class SpritePack:
+    def __init__(self, image_path="assets/sprites.png", index_path="assets/sprites.json"):
+        self.image_path = image_path
+        self.index_path = index_path
+        self.atlas = None
+        self.index = None
+
+    def available(self):
+        return os.path.exists(self.image_path) and os.path.exists(self.index_path)
+
+    def load(self):
+        if self.atlas is None:
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+            self.atlas = pygame.image.load(self.image_path)
+
+    def get_all(self, name):
+        self.load()
+        return [self.atlas.subsurface(rect).copy() for rect in self.index["sprites"][name]]
+
+    def get(self, name):
+        return self.get_all(name)[0]
+
+    def get_file(self, name):
+        self.load()
+        folder = os.path.dirname(self.index_path)
+        return pygame.image.load(os.path.join(folder, self.index["files"][name]))
+
+
+sprite_pack = SpritePack()
+
+
+# Загрузчик, который берет ресурс из пакета, если он там есть, иначе — исходный файл
+def from_pack(raw_load, pack_load):
+    def load():
+        if sprite_pack.available():
+            try:
+                return pack_load()
+            except (KeyError, IndexError):
+                pass
+        return raw_load()
+    return load
+
+
+def convert_alpha(image):
+    return image.convert_alpha()
+
+
+# Если ни одна картинка не загрузилась, остается красный квадрат, чтобы игра не вылетела
+enemy_fallback = pygame.Surface((80, 80))
+enemy_fallback.fill((255, 0, 0))
+
+assets = AssetManager()
+assets.add("background", from_pack(load_background, lambda: sprite_pack.get_file("background")))
+assets.add("enemies", from_pack(load_enemies, lambda: sprite_pack.get_all("enemies")),
+           lambda images: [img.convert_alpha() for img in images],
+           placeholder=[enemy_fallback])
+for sprite_name, (sprite_path, sprite_size) in SPRITE_FILES.items():
+    assets.add(sprite_name,
+               from_pack(load_scaled(sprite_path, sprite_size),
+                         functools.partial(sprite_pack.get, sprite_name)),
+               convert_alpha)
+
+# Фоновая новогодняя музыка. В браузере берем облегченную дорожку для pygbag
+MUSIC_FILE = "assets/new_year-pygbag.ogg" if WEB else "assets/new_year.ogg"
+
+
+# Музыка запрашивается только после первого показанного кадра, чтобы не задерживать
+# старт. Под pygbag загрузка идет отдельной задачей asyncio, main() ее не ждет
+class BackgroundMusic:
+    def __init__(self, path, volume=0.2):
+        self.path = path
+        self.volume = volume
+        self.requested = False
+        self.loaded = False
+        self.enabled = True
+
+    def request(self):
+        if self.requested or HEADLESS:
+            return
+        self.requested = True
+        if WEB:
+            asyncio.get_event_loop().create_task(self.load_async())
+        else:
+            self.load()
 
-try:
-    artem_image = pygame.image.load("assets/artem.png").convert_alpha()
-    artem_image = pygame.transform.scale(artem_image, (45, 45))
-except:
-    artem_image = None
-    print("Не удалось загрузить artem.png")
+    async def load_async(self):
+        # Сначала даем браузеру показать кадр
+        await asyncio.sleep(0)
+        self.load()
+
+    def load(self):
+        try:
+            pygame.mixer.music.load(self.path)
+            pygame.mixer.music.set_volume(self.volume)
+            pygame.mixer.music.play(-1)
+            self.loaded = True
+            # Звук могли выключить клавишей M, пока музыка грузилась
+            if not self.enabled:
+                pygame.mixer.music.pause()
+        except Exception:
+            print(f"Не удалось загрузить фоновую музыку ({os.path.basename(self.path)})")
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if not self.loaded:
+            return
+        if self.enabled:
+            pygame.mixer.music.unpause()
+        else:
+            pygame.mixer.music.pause()
+
+
+background_music = BackgroundMusic(MUSIC_FILE)
 
 # Загрузка шрифтов
 try:
@@ -93,6 +301,8 @@ except:
     font_small = pygame.font.Font(None, 24)
     font_xsmall = pygame.font.Font(None, 20)
 
+profiler_font = pygame.font.Font(None, 18)
+
 # Новогодняя цветовая палитра
 COLORS = {
     "background": (10, 20, 30),
@@ -117,14 +327,206 @@ COLORS = {
 }
 
 
-# Состояния игры
+# Кэш отрисованного текста: одна и та же строка растеризуется шрифтом только один раз
+class TextCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, antialias, tuple(color))
+        text_surf = self.surfaces.get(key)
+        if text_surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return text_surf
+
+        self.misses += 1
+        text_surf = font.render(text, antialias, color)
+        self.surfaces[key] = text_surf
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return text_surf
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+text_cache = TextCache()
+
+
+# Перенос текста по ширине: каждое слово меряется один раз (ширины слов общие
+# для всех текстов шрифта), строки собираются по накопленной ширине за один
+# проход, а у самой границы строка перемеряется целиком. Слово шире строки
+# режется на куски. Готовые переносы кэшируются
+# по (шрифт, текст, ширина)
+class TextLayout:
+    def __init__(self, max_size=256, max_words=4096):
+        self.max_size = max_size
+        self.max_words = max_words
+        self.layouts = OrderedDict()
+        self.widths = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def measure(self, font, word):
+        key = (font, word)
+        width = self.widths.get(key)
+        if width is None:
+            if len(self.widths) >= self.max_words:
+                self.widths.clear()
+            width = self.widths[key] = font.size(word)[0]
+        return width
+
+    # Самые длинные префиксы, которые влезают в max_width (минимум один символ)
+    def break_word(self, word, font, max_width):
+        pieces = []
+        while word:
+            low, high = 1, len(word)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if font.size(word[:middle])[0] <= max_width:
+                    low = middle
+                else:
+                    high = middle - 1
+            pieces.append(word[:low])
+            word = word[low:]
+        return pieces
+
+    def layout(self, text, font, max_width):
+        space = self.measure(font, " ")
+        lines = []
+        current = []
+        width = 0
+
+        for word in text.split(" "):
+            word_width = self.measure(font, word)
+            if word_width > max_width:
+                if current:
+                    lines.append(" ".join(current))
+                pieces = self.break_word(word, font, max_width)
+                lines.extend(pieces[:-1])
+                current = [pieces[-1]]
+                width = self.measure(font, pieces[-1])
+                continue
+
+            new_width = width + space + word_width if current else word_width
+            # Сумма ширин слов отличается от ширины склеенной строки на кернинг у
+            # пробелов (до пикселя-двух на стык) — у границы строка меряется целиком
+            if current and abs(new_width - max_width) <= 2 * (len(current) + 1):
+                new_width = font.size(" ".join(current) + " " + word)[0]
+            if new_width > max_width:
+                lines.append(" ".join(current))
+                current = [word]
+                width = word_width
+            else:
+                current.append(word)
+                width = new_width
+
+        if current:
+            lines.append(" ".join(current))
+        return lines
+
+    # Возвращаемый список общий: его можно читать, но не менять
+    def wrap(self, text, font, max_width):
+        key = (font, text, max_width)
+        lines = self.layouts.get(key)
+        if lines is not None:
+            self.hits += 1
+            self.layouts.move_to_end(key)
+            return lines
+
+        self.misses += 1
+        lines = self.layouts[key] = self.layout(text, font, max_width)
+        if len(self.layouts) > self.max_size:
+            self.layouts.popitem(last=False)
+            self.evictions += 1
+        return lines
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.layouts),
+            "words": len(self.widths),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        self.layouts.clear()
+        self.widths.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+text_layout = TextLayout()
+
+
+# Возвращаемая поверхность общая: её можно только блитить, но не менять
+def render_text(font, text, antialias, color):
+    return text_cache.render(font, text, antialias, color)
+
+
+# Пул сущностей: отработавшие объекты складываются в свободный список и потом
+# переиспользуются через reset вместо нового выделения. max_free ограничивает запас
+class EntityPool:
+    def __init__(self, factory, max_free=256):
+        self.factory = factory
+        self.max_free = max_free
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            entity = self.factory(*args, **kwargs)
+            self.created += 1
+        return entity
+
+    def release(self, entity):
+        if len(self.free) < self.max_free:
+            self.free.append(entity)
+
+    def stats(self):
+        return {"created": self.created, "reused": self.reused, "free": len(self.free)}
+
+
+# Сущности, которые живут секунды и создаются пачками, сделаны со __slots__
+# (без __dict__ на каждый объект) и берутся из пулов
 class JumpNotification:
+    __slots__ = ("x", "y", "points", "life", "start_y", "prev_y")
+
     def __init__(self, x, y, points):
+        self.reset(x, y, points)
+
+    def reset(self, x, y, points):
         self.x = x
         self.y = y
         self.points = points
         self.life = 60
         self.start_y = y
+        self.prev_y = y
 
     def update(self):
         self.life -= 1
@@ -132,13 +534,21 @@ class JumpNotification:
 
     def draw(self, surface):
         if self.life > 0:
-            text_surf = font_medium.render(f"+{self.points}", True, COLORS["success"])
+            text_surf = render_text(font_medium, f"+{self.points}", True, COLORS["success"])
             surface.blit(text_surf, (self.x, self.y))
 
+    def get_dirty_rect(self):
+        text_surf = render_text(font_medium, f"+{self.points}", True, COLORS["success"])
+        return text_surf.get_rect(topleft=(self.x, self.y))
+
     def is_dead(self):
         return self.life <= 0
 
 
+notification_pool = EntityPool(JumpNotification)
+
+
+# Состояния игры
 class GameState(Enum):
     MENU = 1
     PLAYING = 2
@@ -148,53 +558,425 @@ class GameState(Enum):
     FINISHED = 6
 
 
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = random.randint(3, 8)
-        self.speed_x = random.uniform(-2, 2)
-        self.speed_y = random.uniform(-3, 0)
-        self.life = 30
-        self.gravity = 0.1
-        self.sparkle = random.randint(0, 10)
+# Профилировщик кадра: время горячих участков копится за кадр, последние window
+# кадров хранятся для среднего, p99 и графика. Сбор стоит пару perf_counter на
+# вызов, так что его можно не выключать; оверлей (F3) перерисовывается раз в
+# refresh_frames кадров, F4 сохраняет замеры в JSON
+PROFILER_SECTIONS = ["update", "background", "obstacles", "developers", "particles",
+                     "ui", "popup", "flip"]
+
+
+class FrameProfiler:
+    def __init__(self, window=240, refresh_frames=15):
+        self.window = window
+        self.refresh_frames = refresh_frames
+        self.visible = False
+        self.current = dict.fromkeys(PROFILER_SECTIONS, 0.0)
+        self.history = {name: deque(maxlen=window) for name in PROFILER_SECTIONS}
+        self.frame_times = deque(maxlen=window)
+        self.frame_start = None
+        self.idle_seconds = 0.0
+        self.overlay = None
+        self.frames_since_refresh = 0
+        # Время вложенных участков для каждого открытого участка: участки
+        # исключающие, частицы внутри отрисовки разработчика идут только в particles
+        self.nested = []
+
+    def add(self, name, seconds):
+        self.current[name] += seconds
+
+    def enter(self):
+        self.nested.append(0.0)
+
+    def exit(self, name, seconds):
+        self.add(name, seconds - self.nested.pop())
+        if self.nested:
+            self.nested[-1] += seconds
+
+    # Кадр — это работа от next_frame до end_frame (после вывода на экран), без
+    # ожидания в clock.tick и без отданного браузеру времени внутри idle()
+    def next_frame(self):
+        if self.frame_start is not None:
+            self.end_frame()
+        self.frame_start = time.perf_counter()
+        self.idle_seconds = 0.0
+        self.frames_since_refresh += 1
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        work = time.perf_counter() - self.frame_start - self.idle_seconds
+        self.frame_times.append(work * 1000)
+        for name, seconds in self.current.items():
+            self.history[name].append(seconds * 1000)
+            self.current[name] = 0.0
+        self.frame_start = None
+
+    @contextmanager
+    def idle(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.idle_seconds += time.perf_counter() - start
+
+    def stats(self):
+        result = {}
+        for name, samples in [("frame", self.frame_times)] + list(self.history.items()):
+            if samples:
+                ordered = sorted(samples)
+                result[name] = {
+                    "avg": sum(ordered) / len(ordered),
+                    "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+                }
+        return result
+
+    def build_overlay(self):
+        stats = self.stats()
+        rows = [("участок, мс", "сред", "p99")]
+        for name in ["frame"] + PROFILER_SECTIONS:
+            if name in stats:
+                rows.append((name, f"{stats[name]['avg']:.2f}", f"{stats[name]['p99']:.2f}"))
+
+        graph_width, graph_height = self.window, 50
+        overlay = pygame.Surface((max(graph_width, 260) + 20, (len(rows) + 1) * 18 + graph_height + 30),
+                                 pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))
+        # Числа меняются каждый раз — рендерим напрямую, чтобы не вытеснять кэш текста
+        header = f"FPS: {int(clock.get_fps())}   качество: {quality.tier_name}"
+        overlay.blit(profiler_font.render(header, True, COLORS["text"]), (10, 8))
+        for i, (name, avg, p99) in enumerate(rows):
+            y = 8 + (i + 1) * 18
+            overlay.blit(profiler_font.render(name, True, COLORS["text_secondary"]), (10, y))
+            for text, right in ((avg, 170), (p99, 230)):
+                text_surf = profiler_font.render(text, True, COLORS["text_secondary"])
+                overlay.blit(text_surf, text_surf.get_rect(topright=(right, y)))
+
+        graph_top = (len(rows) + 1) * 18 + 20
+        graph_rect = pygame.Rect(10, graph_top, graph_width, graph_height)
+        pygame.draw.rect(overlay, (40, 40, 40, 200), graph_rect)
+        # Линии бюджета 60 и 30 FPS; шкала графика — 50 мс
+        for budget, color in ((1000 / 60, COLORS["secondary"]), (1000 / 30, COLORS["warning"])):
+            y = graph_rect.bottom - budget / 50 * graph_height
+            pygame.draw.line(overlay, color, (graph_rect.left, y), (graph_rect.right, y))
+        for i, frame_ms in enumerate(self.frame_times):
+            bar = min(frame_ms / 50, 1.0) * graph_height
+            color = COLORS["success"] if frame_ms <= 1000 / 60 else COLORS["primary"]
+            pygame.draw.line(overlay, color, (graph_rect.left + i, graph_rect.bottom),
+                             (graph_rect.left + i, graph_rect.bottom - bar))
+        return overlay.convert_alpha()
+
+    def draw(self, surface):
+        if self.overlay is None or self.frames_since_refresh >= self.refresh_frames:
+            self.overlay = self.build_overlay()
+            self.frames_since_refresh = 0
+        rect = self.overlay.get_rect(bottomleft=(10, HEIGHT - 10))
+        surface.blit(self.overlay, rect)
+        return rect
+
+    def dump(self, path):
+        data = {
+            "window": self.window,
+            "frame_ms": list(self.frame_times),
+            "sections_ms": {name: list(samples) for name, samples in self.history.items()},
+            "stats": self.stats(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"Профиль сохранен в {path}")
+
+
+profiler = FrameProfiler()
+
+
+# Декоратор для горячих участков: время вызова идет в секцию профилировщика
+def profiled(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler.enter()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# Уровни качества: от полного до минимального. Доли применяются к числу снежинок
+# на экране и к размеру всплесков частиц
+QUALITY_TIERS = [
+    {"name": "high", "snowflakes": 1.0, "particles": 1.0, "glow": True, "smoothscale": True},
+    {"name": "medium", "snowflakes": 0.6, "particles": 0.6, "glow": True, "smoothscale": True},
+    {"name": "low", "snowflakes": 0.35, "particles": 0.35, "glow": False, "smoothscale": True},
+    {"name": "minimal", "snowflakes": 0.15, "particles": 0.2, "glow": False, "smoothscale": False},
+]
+
+
+# Следит за временем кадра (без учета ожидания clock.tick) в скользящем окне и
+# переключает уровни качества. Гистерезис: вниз — когда среднее выше бюджета,
+# вверх — только когда оно заметно ниже, и после каждого переключения окно
+# набирается заново
+class QualityGovernor:
+    def __init__(self, budget_ms=1000 / 60, window=60, downgrade_ratio=1.0, upgrade_ratio=0.6):
+        self.budget_ms = budget_ms
+        self.window = window
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.frame_times = []
+        self.tier = 0
+
+    @property
+    def settings(self):
+        return QUALITY_TIERS[self.tier]
+
+    @property
+    def tier_name(self):
+        return self.settings["name"]
+
+    def record(self, frame_ms):
+        self.frame_times.append(frame_ms)
+        if len(self.frame_times) < self.window:
+            return
+        average = sum(self.frame_times) / len(self.frame_times)
+        self.frame_times.clear()
+
+        if average > self.budget_ms * self.downgrade_ratio and self.tier < len(QUALITY_TIERS) - 1:
+            self.set_tier(self.tier + 1, average)
+        elif average < self.budget_ms * self.upgrade_ratio and self.tier > 0:
+            self.set_tier(self.tier - 1, average)
+
+    def set_tier(self, tier, average=None):
+        self.tier = tier
+        self.frame_times.clear()
+        if average is not None:
+            print(f"Качество: {self.tier_name} (кадр {average:.1f} мс)")
+
+
+quality = QualityGovernor()
+
+
+# Готовые кружки для частиц и снежинок. Радиус и прозрачность квантуются по корзинам,
+# старые спрайты вытесняются по LRU
+class SpriteCache:
+    def __init__(self, max_size=512, radius_step=1, alpha_step=16):
+        self.max_size = max_size
+        self.radius_step = radius_step
+        self.alpha_step = alpha_step
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Работает и с числами, и с массивами NumPy
+    def quantize(self, radius, alpha):
+        radius = np.maximum(np.rint(np.asarray(radius) / self.radius_step) * self.radius_step, 1)
+        alpha = np.clip(np.rint(np.asarray(alpha) / self.alpha_step) * self.alpha_step, 0, 255)
+        return radius.astype(np.int32), alpha.astype(np.int32)
+
+    def get(self, color, radius, alpha):
+        radius, alpha = self.quantize(radius, alpha)
+        return self.get_bucket(tuple(color), int(radius), int(alpha))
+
+    def get_bucket(self, color, radius, alpha):
+        key = (color, radius, alpha)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+        sprite = sprite.convert_alpha()
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+            self.evictions += 1
+        return sprite
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.sprites),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        self.sprites.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+sprite_cache = SpriteCache()
+
+
+# Частицы хранятся как параллельные массивы NumPy и обновляются векторно
+PARTICLE_LIFE = 30
+PARTICLE_GRAVITY = 0.1
+
+particle_rng = np.random.default_rng()
+
+
+class ParticleSystem:
+    def __init__(self, capacity=64, rng=None):
+        self.rng = rng if rng is not None else particle_rng
+        self.count = 0
+        self.capacity = 0
+        self.pos = np.zeros((0, 2))
+        self.prev_pos = np.zeros((0, 2))
+        self.vel = np.zeros((0, 2))
+        self.life = np.zeros(0, np.int32)
+        self.size = np.zeros(0)
+        self.color = np.zeros((0, 3), np.uint8)
+        self.sparkle = np.zeros(0, np.int32)
+        # Доля шага для интерполяции позиций при отрисовке (1.0 — текущее состояние)
+        self.render_alpha = 1.0
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def arrays(self):
+        return self.pos, self.prev_pos, self.vel, self.life, self.size, self.color, self.sparkle
+
+    def grow(self, capacity):
+        resized = []
+        for array in self.arrays():
+            new_array = np.zeros((capacity,) + array.shape[1:], array.dtype)
+            new_array[:self.count] = array[:self.count]
+            resized.append(new_array)
+        self.pos, self.prev_pos, self.vel, self.life, self.size, self.color, self.sparkle = resized
+        self.capacity = capacity
+
+    # Размер всплеска зависит от текущего уровня качества
+    def emit(self, x, y, color, count):
+        self.spawn(x, y, color, int(count * quality.settings["particles"]))
+
+    def emit_scattered(self, x_range, y_range, colors, count):
+        count = int(count * quality.settings["particles"])
+        xs = self.rng.integers(x_range[0], x_range[1] + 1, count)
+        ys = self.rng.integers(y_range[0], y_range[1] + 1, count)
+        palette = np.array(colors, np.uint8)
+        self.spawn(xs, ys, palette[self.rng.integers(0, len(palette), count)], count)
+
+    def spawn(self, x, y, color, count):
+        if count <= 0:
+            return
+        if self.count + count > self.capacity:
+            self.grow(max(self.capacity * 2, self.count + count))
+
+        start, end = self.count, self.count + count
+        self.pos[start:end, 0] = x
+        self.pos[start:end, 1] = y
+        self.prev_pos[start:end] = self.pos[start:end]
+        self.vel[start:end, 0] = self.rng.uniform(-2, 2, count)
+        self.vel[start:end, 1] = self.rng.uniform(-3, 0, count)
+        self.life[start:end] = PARTICLE_LIFE
+        self.size[start:end] = self.rng.integers(3, 9, count)
+        self.color[start:end] = color
+        self.sparkle[start:end] = self.rng.integers(0, 11, count)
+        self.count = end
+
+    def snapshot(self):
+        self.prev_pos[:self.count] = self.pos[:self.count]
 
     def update(self):
-        self.x += self.speed_x
-        self.y += self.speed_y
-        self.speed_y += self.gravity
-        self.life -= 1
-        self.size *= 0.95
-        self.sparkle = (self.sparkle + 1) % 20
+        n = self.count
+        if n == 0:
+            return
 
+        self.pos[:n] += self.vel[:n]
+        self.vel[:n, 1] += PARTICLE_GRAVITY
+        self.life[:n] -= 1
+        self.size[:n] *= 0.95
+        self.sparkle[:n] = (self.sparkle[:n] + 1) % 20
+
+        alive = self.life[:n] > 0
+        if not alive.all():
+            self.compact(alive)
+
+    def compact(self, alive):
+        # Удаляем все мертвые частицы за один проход, без list.remove
+        keep = np.flatnonzero(alive)
+        for array in self.arrays():
+            array[:len(keep)] = array[keep]
+        self.count = len(keep)
+
+    def clear(self):
+        self.count = 0
+
+    # Область по тем же позициям, что рисует draw (с учетом render_alpha)
+    def get_dirty_rect(self):
+        n = self.count
+        if n == 0:
+            return None
+        pos = self.pos[:n]
+        if self.render_alpha < 1.0:
+            pos = self.prev_pos[:n] + (pos - self.prev_pos[:n]) * self.render_alpha
+        reach = self.size[:n].max() + 2
+        left, top = pos.min(axis=0) - reach
+        right, bottom = pos.max(axis=0) + reach
+        return pygame.Rect(int(left), int(top), int(right - left) + 1, int(bottom - top) + 1)
+
+    @profiled("particles")
     def draw(self, surface):
-        if self.life > 0:
-            alpha = int(255 * (self.life / 30))
-            if self.sparkle < 15:
-                alpha = int(alpha * 0.7)
-            s = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*self.color, alpha), (self.size, self.size), self.size)
-            surface.blit(s, (self.x - self.size, self.y - self.size))
-
-    def is_dead(self):
-        return self.life <= 0
+        n = self.count
+        if n == 0:
+            return
 
+        alpha = 255 * self.life[:n] // PARTICLE_LIFE
+        dimmed = self.sparkle[:n] < 15
+        alpha[dimmed] = alpha[dimmed] * 7 // 10
+        radius, alpha = sprite_cache.quantize(self.size[:n], alpha)
+        pos = self.pos[:n]
+        if self.render_alpha < 1.0:
+            pos = self.prev_pos[:n] + (pos - self.prev_pos[:n]) * self.render_alpha
+        corner = pos - radius[:, None]
+
+        # Частицы группируются по корзине (цвет, радиус, альфа): спрайт каждой
+        # корзины достается из кэша один раз за кадр, дальше — индекс по inverse
+        color = self.color[:n].astype(np.int64)
+        keys = (((color[:, 0] << 16 | color[:, 1] << 8 | color[:, 2]) << 24) |
+                (radius.astype(np.int64) << 9) | alpha)
+        buckets, inverse = np.unique(keys, return_inverse=True)
+        sprites = [sprite_cache.get_bucket((key >> 40, key >> 32 & 0xFF, key >> 24 & 0xFF),
+                                           key >> 9 & 0x7FFF, key & 0x1FF)
+                   for key in buckets.tolist()]
+        blit_batch(surface, zip([sprites[i] for i in inverse.tolist()], corner.tolist()))
+
+# Враг бесконечного режима: его нужно перепрыгнуть, касание сбивает скорость
 class Obstacle:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "prev_x", "width", "height", "collected", "passed", "image", "speed")
+
+    def __init__(self, x, y, speed=8, rng=None):
+        self.reset(x, y, speed, rng)
+
+    def reset(self, x, y, speed=8, rng=None):
+        rng = rng if rng is not None else particle_rng
         self.x = x
         self.y = y
+        self.prev_x = x
         self.width = 80
         self.height = 80
+        self.collected = False
+        self.passed = False
 
         # 🎲 случайный персонаж
-        self.image = random.choice(enemy_images) if enemy_images else None
+        enemy_images = assets.get("enemies")
+        self.image = enemy_images[rng.integers(len(enemy_images))] if enemy_images else None
 
-        self.speed = 8
+        self.speed = speed
 
-    def update(self):
+    def update(self, ticks=None):
         self.x -= self.speed
+        return self.x < -100
 
+    @profiled("obstacles")
     def draw(self, surface):
         if self.image:
             surface.blit(self.image, (self.x, self.y))
@@ -210,11 +992,345 @@ class Obstacle:
     def get_rect(self):
         return pygame.Rect(self.x, self.y, self.width, self.height)
 
+    # Враг сдвигается на speed за шаг: область накрывает и прошлое, и текущее место
+    def get_dirty_rect(self):
+        previous = pygame.Rect(self.prev_x, self.y, self.width, self.height)
+        return self.get_rect().union(previous).inflate(4, 4)
+
+    def check_collision(self, developer):
+        if self.collected:
+            return False
+
+        dx = (developer.x + developer.width // 2) - (self.x + self.width // 2)
+        dy = (developer.y + developer.height // 2) - (self.y + self.height // 2)
+        reach = developer.width // 2 + self.width // 2
+        return dx * dx + dy * dy < reach * reach
+
+
+obstacle_pool = EntityPool(Obstacle)
+
+# Кэш круглых портретов: маска накладывается один раз на пару (картинка, размер)
+class FaceCache:
+    def __init__(self):
+        self.faces = {}
+        self.masks = {}
+
+    def get_mask(self, face_size):
+        mask = self.masks.get(face_size)
+        if mask is None:
+            mask = pygame.Surface((face_size, face_size), pygame.SRCALPHA)
+            radius = face_size // 2
+            for y in range(face_size):
+                dy = (y - radius) ** 2
+                for x in range(face_size):
+                    if (x - radius) ** 2 + dy <= radius ** 2:
+                        mask.set_at((x, y), (255, 255, 255, 255))
+            self.masks[face_size] = mask
+        return mask
+
+    def get(self, image, face_size, smooth=True):
+        key = (id(image), face_size, smooth)
+        cached = self.faces.get(key)
+        # Проверяем саму картинку: id может переиспользоваться после замены
+        if cached is not None and cached[0] is image:
+            return cached[1]
+
+        scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+        scaled_face = scale(image, (face_size, face_size))
+        face_surface = pygame.Surface((face_size, face_size), pygame.SRCALPHA)
+        face_surface.blit(scaled_face, (0, 0))
+        face_surface.blit(self.get_mask(face_size), (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        face_surface = face_surface.convert_alpha()
+
+        self.faces[key] = (image, face_surface)
+        return face_surface
+
+
+face_cache = FaceCache()
+
+
+# Готовый фон под размер окна: картинка или градиент строятся один раз
+class BackgroundLayer:
+    def __init__(self):
+        self.surface = None
+        self.size = None
+        self.source = None
+
+    def build(self, size, source):
+        width, height = size
+        if source:
+            layer = pygame.transform.scale(source, (width, height))
+        else:
+            layer = pygame.Surface((width, height))
+            for y in range(height):
+                color_value = int(10 + (y / height) * 20)
+                pygame.draw.line(layer, (color_value, color_value + 5, color_value + 30),
+                                 (0, y), (width, y))
+        return layer.convert()
+
+    def get(self, size, source):
+        if self.surface is None or self.size != size or self.source is not source:
+            self.surface = self.build(size, source)
+            self.size = size
+            self.source = source
+        return self.surface
+
+
+background_layer = BackgroundLayer()
+
+
+# Снежинки: по одному готовому спрайту на каждый размер, рисуются одним пакетом
+SNOWFLAKE_COUNT = 120
+SNOWFLAKE_MIN_SIZE = 15
+SNOWFLAKE_MAX_SIZE = 35
+# Слои глубины: яркость (она же скорость падения) делится на полосы, дальние
+# тусклые слои рисуются первыми и падают медленнее ближних
+SNOWFLAKE_LAYERS = 3
+SNOWFLAKE_MIN_BRIGHTNESS = 0.3
+
+
+class SnowflakeAtlas:
+    # Для запасных кружков яркость квантуется, чтобы спрайтов было конечное число
+    BRIGHTNESS_LEVELS = 8
+
+    def __init__(self):
+        self.sprites = {}
+        self.source = None
+        self.built = False
+
+    def key(self, size, brightness):
+        if self.source:
+            return size
+        return size, min(int(brightness * self.BRIGHTNESS_LEVELS), self.BRIGHTNESS_LEVELS)
+
+    def build(self, source):
+        self.sprites = {}
+        for size in range(SNOWFLAKE_MIN_SIZE, SNOWFLAKE_MAX_SIZE + 1):
+            if source:
+                sprite = pygame.transform.scale(source, (size, size)).convert_alpha()
+                self.sprites[size] = (sprite, size // 2)
+            else:
+                for level in range(self.BRIGHTNESS_LEVELS + 1):
+                    alpha = int(200 * level / self.BRIGHTNESS_LEVELS)
+                    sprite = sprite_cache.get(COLORS["snow"], size, alpha)
+                    self.sprites[size, level] = (sprite, size)
+        self.source = source
+        self.built = True
+
+    def get_sprites(self, source):
+        if not self.built or self.source is not source:
+            self.build(source)
+        return self.sprites
+
+
+snowflake_atlas = SnowflakeAtlas()
+
+
+# Снегопад в массивах NumPy: шаг — несколько векторных операций на все снежинки
+# (падение, снос по синусу, возврат наверх), новые x при возврате берутся
+# из своего сидированного генератора. Порядок хранения случайный, поэтому
+# на низком качестве берется просто префикс; рисуются снежинки от дальних к ближним
+class Snowfall:
+    def __init__(self, count=SNOWFLAKE_COUNT, rng=None, layers=SNOWFLAKE_LAYERS):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = count
+        self.x = self.rng.integers(0, WIDTH + 1, count).astype(float)
+        self.y = self.rng.integers(0, HEIGHT + 1, count).astype(float)
+
+        # Яркость равномерна в своей полосе слоя, слои вместе покрывают [min, 1]
+        self.layer = self.rng.integers(0, layers, count)
+        band = (1.0 - SNOWFLAKE_MIN_BRIGHTNESS) / layers
+        self.brightness = SNOWFLAKE_MIN_BRIGHTNESS + band * (self.layer + self.rng.uniform(0.0, 1.0, count))
+        self.size = self.rng.integers(SNOWFLAKE_MIN_SIZE, SNOWFLAKE_MAX_SIZE + 1, count)
+
+        self.draw_order = np.argsort(self.layer, kind="stable")
+        self.sprites = None
+        self.offsets = None
+        self.sprites_source = None
+
+    def update(self, ticks):
+        self.y += self.brightness * 3
+        self.x += np.sin(ticks * 0.001 + self.x) * 0.5
+
+        fallen = self.y > HEIGHT
+        fallen_count = int(np.count_nonzero(fallen))
+        if fallen_count:
+            self.y[fallen] = -self.size[fallen]
+            self.x[fallen] = self.rng.integers(0, WIDTH + 1, fallen_count)
+
+    # Индексы первых fraction снежинок в порядке отрисовки
+    def visible(self, fraction):
+        n = int(self.count * fraction)
+        order = self.draw_order
+        return order if n >= self.count else order[order < n]
+
+    # Спрайт и смещение для каждой снежинки: размер и яркость не меняются,
+    # поэтому список пересобирается только при смене атласа
+    def get_sprites(self, atlas_sprites):
+        if self.sprites_source is not atlas_sprites:
+            self.sprites = [atlas_sprites[snowflake_atlas.key(size, brightness)]
+                            for size, brightness in zip(self.size.tolist(), self.brightness.tolist())]
+            self.offsets = np.array([offset for _, offset in self.sprites], dtype=float)
+            self.sprites_source = atlas_sprites
+        return self.sprites
+
+    # lag — на сколько шагов падения откатить позиции для интерполяции
+    def blit_sequence(self, atlas_sprites, indices, lag=0.0):
+        sprites = self.get_sprites(atlas_sprites)
+        offsets = self.offsets[indices]
+        xs = (self.x[indices] - offsets).tolist()
+        ys = (self.y[indices] - self.brightness[indices] * lag - offsets).tolist()
+        return [(sprites[i][0], (x, y)) for i, x, y in zip(indices.tolist(), xs, ys)]
+
+    # lag — тот же откат, что и при отрисовке, чтобы области совпали с нарисованным
+    def dirty_rects(self, atlas_sprites, indices, lag=0.0):
+        sprites = self.get_sprites(atlas_sprites)
+        ys = self.y[indices] - self.brightness[indices] * lag
+        rects = []
+        for i, x, y in zip(indices.tolist(), self.x[indices].astype(int).tolist(),
+                           ys.astype(int).tolist()):
+            sprite, offset = sprites[i]
+            width, height = sprite.get_size()
+            rects.append(pygame.Rect(x - offset - 1, y - offset - 1, width + 2, height + 2))
+        return rects
+
+
+# pygame-ce умеет fblits (без возврата прямоугольников), обычный pygame — только blits
+def blit_batch(surface, sequence):
+    if hasattr(surface, "fblits"):
+        surface.fblits(sequence)
+    else:
+        surface.blits(sequence, doreturn=False)
+
+
+# Кэш повернутых кадров: угол округляется до шага, кадры вытесняются по LRU
+# при превышении лимита памяти
+class RotationCache:
+    def __init__(self, angle_step=2, max_bytes=64 * 1024 * 1024):
+        self.angle_step = angle_step
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        self.used_bytes = 0
+
+    def get(self, image, angle):
+        step_index = round(angle / self.angle_step) % round(360 / self.angle_step)
+        key = (image, step_index)
+        frame = self.frames.get(key)
+        if frame is not None:
+            self.frames.move_to_end(key)
+            return frame
+
+        frame = pygame.transform.rotate(image, step_index * self.angle_step)
+        self.frames[key] = frame
+        self.used_bytes += self.frame_bytes(frame)
+        while self.used_bytes > self.max_bytes and len(self.frames) > 1:
+            _, evicted = self.frames.popitem(last=False)
+            self.used_bytes -= self.frame_bytes(evicted)
+        return frame
+
+    @staticmethod
+    def frame_bytes(frame):
+        return frame.get_width() * frame.get_height() * frame.get_bytesize()
+
+    def clear(self):
+        self.frames.clear()
+        self.used_bytes = 0
+
+
+rotation_cache = RotationCache()
+
+
+# Часы симуляции: время считается шагами, а не реальными миллисекундами,
+# поэтому результат одинаков при каждом запуске и на любой машине
+class FrameClock:
+    def __init__(self, fps=60):
+        self.fps = fps
+        self.frame = 0
+
+    def advance(self):
+        self.frame += 1
+
+    def ticks(self):
+        return self.frame * 1000 // self.fps
+
+
+# Фиксированный шаг симуляции: вся физика задана в единицах «на шаг» (1/60 с).
+# Накопитель переводит реальное время кадра в целое число шагов, остаток идет
+# в интерполяцию при отрисовке. Догоняющих шагов не больше max_steps за кадр
+SIMULATION_RATE = 60
+RENDER_FPS = 60  # 0 — без ограничения частоты отрисовки
+MAX_CATCH_UP_STEPS = 5
+
+
+class FixedTimestep:
+    def __init__(self, rate=SIMULATION_RATE, max_steps=MAX_CATCH_UP_STEPS):
+        self.step_ms = 1000 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_ms):
+        self.accumulator += elapsed_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            # Слишком сильно отстали: пропускаем время, а не замедляем игру
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_ms
+        return steps
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.step_ms, 1.0)
+
+
+# Вывод кадра только по изменившимся областям (display.update(rects)) вместо flip.
+# Если грязных областей слишком много, дешевле показать кадр целиком
+class DirtyRectRenderer:
+    def __init__(self, enabled=False, max_dirty_ratio=0.5):
+        self.enabled = enabled
+        self.max_dirty_ratio = max_dirty_ratio
+        self.previous_rects = []
+        self.full_redraw = True
+        self.full_flips = 0
+        self.partial_updates = 0
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    @profiled("flip")
+    def present(self, rects):
+        if not self.enabled or self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+            self.previous_rects = rects
+            self.full_flips += 1
+            return
+
+        screen_rect = pygame.display.get_surface().get_rect()
+        # Старые позиции тоже нужно обновить, иначе на экране останется след
+        dirty = [rect.clip(screen_rect) for rect in self.previous_rects + rects]
+        dirty = [rect for rect in dirty if rect.width and rect.height]
+        dirty_area = sum(rect.width * rect.height for rect in dirty)
+
+        if dirty_area > self.max_dirty_ratio * screen_rect.width * screen_rect.height:
+            pygame.display.flip()
+            self.full_flips += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_updates += 1
+        self.previous_rects = rects
+
+
+dirty_renderer = DirtyRectRenderer()
+
+
 class Developer:
-    def __init__(self, x, y, color, name, icon_text):
+    def __init__(self, x, y, color, name, icon_text, rng=None):
         self.x = x
         self.y = y
         self.start_y = y
+        self.prev_y = y
         self.color = color
         self.name = name
         self.icon_text = icon_text
@@ -227,7 +1343,7 @@ class Developer:
         self.animation_frame = 0
         self.run_frames = [0, 1, 2, 1]
         self.frame_timer = 0
-        self.particles = []
+        self.particles = ParticleSystem(rng=rng)
         self.jump_power = 1.0
 
     def jump(self, power=1.0):
@@ -242,12 +1358,7 @@ class Developer:
             self.create_jump_particles()
 
     def create_jump_particles(self):
-        for _ in range(10):
-            self.particles.append(Particle(
-                self.x + self.width // 2,
-                self.y + self.height,
-                self.color
-            ))
+        self.particles.emit(self.x + self.width // 2, self.y + self.height, self.color, 10)
 
     def update(self):
         self.velocity_y += 0.8
@@ -267,19 +1378,12 @@ class Developer:
                 self.frame_timer = 0
                 self.animation_frame = (self.animation_frame + 1) % len(self.run_frames)
 
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.is_dead():
-                self.particles.remove(particle)
+        self.particles.update()
 
     def create_land_particles(self):
-        for _ in range(15):
-            self.particles.append(Particle(
-                self.x + self.width // 2,
-                self.y + self.height,
-                (255, 255, 255)
-            ))
+        self.particles.emit(self.x + self.width // 2, self.y + self.height, (255, 255, 255), 15)
 
+    @profiled("developers")
     def draw(self, surface):
         shadow = pygame.Surface((self.width + 10, 20), pygame.SRCALPHA)
         shadow_alpha = 100 - abs(self.y - self.start_y) * 2
@@ -354,6 +1458,8 @@ class Developer:
                 snow_y = head_y - 30 + math.sin(math.radians(angle)) * 10 + hat_offset
                 pygame.draw.circle(surface, (192, 192, 192), (int(snow_x), int(snow_y)), 2)
 
+        alina_image = assets.get("alina")
+        artem_image = assets.get("artem")
         if self.name == "Алина" and alina_image:
             self.face(alina_image, head_y, surface)
         elif artem_image:
@@ -378,121 +1484,140 @@ class Developer:
             pygame.draw.rect(surface, self.color,
                              (self.x + self.width - 15, self.y + self.height - 10, 10, 15 - leg_offset))
 
-        name_surf = font_small.render(self.name, True, COLORS["text"])
+        name_surf = render_text(font_small, self.name, True, COLORS["text"])
         surface.blit(name_surf, (self.x - 10, self.y - 50))
 
-        for particle in self.particles:
-            particle.draw(surface)
+        self.particles.draw(surface)
+
+    # Всё, что рисует draw: шапка, руки, имя, тень и ноги
+    def get_dirty_rect(self):
+        top = self.y - 80
+        bottom = max(self.y, self.start_y) + self.height + 20
+        return pygame.Rect(self.x - 30, top, self.width + 60, bottom - top)
 
     def face(self, image, head_y, surface):
         face_size = 45
-        scaled_face = pygame.transform.smoothscale(image, (face_size, face_size))
         face_x = self.x + self.width // 2 - face_size // 2
         face_y = head_y - face_size // 2
+        portrait = face_cache.get(image, face_size, quality.settings["smoothscale"])
+        surface.blit(portrait, (face_x, face_y))
 
-        face_surface = pygame.Surface((face_size, face_size), pygame.SRCALPHA)
-        face_surface.blit(scaled_face, (0, 0))
-
-        for x in range(face_size):
-            for y in range(face_size):
-                distance = ((x - face_size // 2) ** 2 + (y - face_size // 2) ** 2) ** 0.5
-                if distance > face_size // 2:
-                    face_surface.set_at((x, y), (0, 0, 0, 0))
 
-        surface.blit(face_surface, (face_x, face_y))
+class AchievementObstacle:
+    __slots__ = ("x", "y", "width", "height", "speed", "data", "collected", "passed",
+                 "particles", "rotation", "bounce_offset", "prev_x", "prev_bounce_offset",
+                 "bounce_speed", "image", "color")
+
+    glow_surfaces = {}
+    block_surfaces = {}
+    types = {
+        "team": COLORS["success"],
+        "deadline": COLORS["warning"],
+        "product": COLORS["primary"],
+        "refactor": COLORS["refactor"],
+        "api": COLORS["obstacle"],
+        "config": COLORS["automation"],
+        "template": COLORS["feature"],
+        "automation": COLORS["secondary"],
+        "reuse": COLORS["dev2"]
+    }
 
+    def __init__(self, achievement_data, x_offset=0, rng=particle_rng, speed=4):
+        self.particles = ParticleSystem(capacity=32, rng=rng)
+        self.reset(achievement_data, x_offset, rng, speed)
 
-class AchievementObstacle:
-    def __init__(self, achievement_data, x_offset=0):
+    # Повторная инициализация объекта из пула: массивы частиц остаются прежними
+    def reset(self, achievement_data, x_offset=0, rng=particle_rng, speed=4):
         self.y = HEIGHT // 2 - 40
         self.x = WIDTH + 150 + x_offset
         self.width = 80
         self.height = 80
-        self.speed = 4
+        self.speed = speed
         self.data = achievement_data
         self.collected = False
         self.passed = False
-        self.particles = []
+        self.particles.rng = rng
+        self.particles.clear()
         self.rotation = 0
         self.bounce_offset = 0
-        self.bounce_speed = random.uniform(0.05, 0.1)
-        self.image = random.choice(enemy_images) if enemy_images else None
-
-        self.types = {
-            "team": COLORS["success"],
-            "deadline": COLORS["warning"],
-            "product": COLORS["primary"],
-            "refactor": COLORS["refactor"],
-            "api": COLORS["obstacle"],
-            "config": COLORS["automation"],
-            "template": COLORS["feature"],
-            "automation": COLORS["secondary"],
-            "reuse": COLORS["dev2"]
-        }
-
-        self.color = self.types.get(achievement_data.get("type", "product"), COLORS["primary"])
-
-    def update(self):
+        self.prev_x = self.x
+        self.prev_bounce_offset = 0
+        self.bounce_speed = rng.uniform(0.05, 0.1)
+        enemy_images = assets.get("enemies")
+        self.image = enemy_images[rng.integers(len(enemy_images))] if enemy_images else None
+        self.color = achievement_data["layout"]["color"]
+
+    def update(self, ticks=None):
+        if ticks is None:
+            ticks = pygame.time.get_ticks()
         self.x -= self.speed
         self.rotation += 2
-        self.bounce_offset = math.sin(pygame.time.get_ticks() * self.bounce_speed) * 5
+        self.bounce_offset = math.sin(ticks * self.bounce_speed) * 5
 
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.is_dead():
-                self.particles.remove(particle)
+        self.particles.update()
 
         return self.x < -100
 
     def create_collect_particles(self):
-        for _ in range(25):
-            self.particles.append(Particle(
-                self.x + self.width // 2,
-                self.y + self.height // 2,
-                self.color
-            ))
+        self.particles.emit(self.x + self.width // 2, self.y + self.height // 2, self.color, 25)
 
+    @profiled("obstacles")
     def draw(self, surface):
         current_y = self.y + self.bounce_offset
 
+        center = (self.x + self.width // 2, current_y + self.height // 2)
+
         if self.image:
-            rotated_img = pygame.transform.rotate(self.image, self.rotation)
-            rotated_rect = rotated_img.get_rect(
-                center=(self.x + self.width // 2,
-                        current_y + self.height // 2)
-            )
-            surface.blit(rotated_img, rotated_rect)
+            rotated_img = rotation_cache.get(self.image, self.rotation)
+            surface.blit(rotated_img, rotated_img.get_rect(center=center))
         else:
-            if not self.collected:
-                glow_size = 20
-                for i in range(3, 0, -1):
-                    glow_surf = pygame.Surface((self.width + i * glow_size,
-                                                self.height + i * glow_size),
-                                               pygame.SRCALPHA)
-                    alpha = 30 // i
-                    pygame.draw.rect(glow_surf, (*self.color, alpha),
-                                     (0, 0, self.width + i * glow_size,
-                                      self.height + i * glow_size),
-                                     0, 15)
-                    surface.blit(glow_surf,
-                                 (self.x - i * glow_size // 2,
-                                  current_y - i * glow_size // 2))
+            if not self.collected and quality.settings["glow"]:
+                glow_surf = self.get_glow_surface()
+                surface.blit(glow_surf, glow_surf.get_rect(center=center))
 
-            block_color = self.color if not self.collected else (*self.color, 100)
-            block_surf = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            pygame.draw.rect(block_surf, block_color, (0, 0, self.width, self.height), 0, 15)
-            rotated_surf = pygame.transform.rotate(block_surf, self.rotation)
-            rotated_rect = rotated_surf.get_rect(center=(self.x + self.width // 2,
-                                                         current_y + self.height // 2))
-            surface.blit(rotated_surf, rotated_rect)
+            rotated_surf = rotation_cache.get(self.get_block_surface(), self.rotation)
+            surface.blit(rotated_surf, rotated_surf.get_rect(center=center))
 
-            icon_surf = font_medium.render(self.data["icon"], True, COLORS["text"])
+            icon_surf = render_text(font_medium, self.data["icon"], True, COLORS["text"])
             icon_rect = icon_surf.get_rect(center=(self.x + self.width // 2,
                                                    current_y + self.height // 2))
             surface.blit(icon_surf, icon_rect)
 
-        for particle in self.particles:
-            particle.draw(surface)
+        self.particles.draw(surface)
+
+    # Запасной вид без картинки: свечение и блок общие для всех препятствий одного цвета
+    def get_glow_surface(self):
+        glow_surf = self.glow_surfaces.get(self.color)
+        if glow_surf is None:
+            glow_size = 20
+            full_width = self.width + 3 * glow_size
+            full_height = self.height + 3 * glow_size
+            glow_surf = pygame.Surface((full_width, full_height), pygame.SRCALPHA)
+            for i in range(3, 0, -1):
+                layer = pygame.Surface((self.width + i * glow_size,
+                                        self.height + i * glow_size),
+                                       pygame.SRCALPHA)
+                pygame.draw.rect(layer, (*self.color, 30 // i), layer.get_rect(), 0, 15)
+                glow_surf.blit(layer, layer.get_rect(center=(full_width // 2, full_height // 2)))
+            glow_surf = glow_surf.convert_alpha()
+            self.glow_surfaces[self.color] = glow_surf
+        return glow_surf
+
+    def get_block_surface(self):
+        key = (self.color, self.collected)
+        block_surf = self.block_surfaces.get(key)
+        if block_surf is None:
+            block_color = self.color if not self.collected else (*self.color, 100)
+            block_surf = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+            pygame.draw.rect(block_surf, block_color, (0, 0, self.width, self.height), 0, 15)
+            block_surf = block_surf.convert_alpha()
+            self.block_surfaces[key] = block_surf
+        return block_surf
+
+    def get_dirty_rect(self):
+        # Повернутый кадр и свечение умещаются в квадрат 140x140 вокруг центра
+        center = (self.x + self.width // 2, self.y + self.height // 2 + self.bounce_offset)
+        return pygame.Rect(0, 0, 140, 140).move(int(center[0]) - 70, int(center[1]) - 70)
 
     def check_collision(self, developer):
         if self.collected:
@@ -503,135 +1628,178 @@ class AchievementObstacle:
         obst_center_x = self.x + self.width // 2
         obst_center_y = self.y + self.height // 2 + self.bounce_offset
 
-        distance = math.sqrt((dev_center_x - obst_center_x) ** 2 +
-                             (dev_center_y - obst_center_y) ** 2)
-
-        return distance < (developer.width // 2 + self.width // 2)
+        reach = developer.width // 2 + self.width // 2
+        return ((dev_center_x - obst_center_x) ** 2 +
+                (dev_center_y - obst_center_y) ** 2) < reach * reach
+
+
+# Столкновения игроков с препятствиями. Широкая фаза: препятствия сортируются по
+# центру x (все едут влево с одной скоростью, порядок почти не меняется, и сортировка
+# почти бесплатная), для каждого игрока бинарным поиском берется только окно
+# препятствий в пределах досягаемости по x. Узкая фаза — квадрат расстояния без sqrt
+class CollisionSystem:
+    @staticmethod
+    def center_x(entity):
+        return entity.x + entity.width // 2
+
+    # Игроки перечисляются по приоритету: если препятствия касаются двое,
+    # оно достается первому. Возвращает {препятствие: игрок}
+    def find_hits(self, obstacles, players):
+        candidates = [obstacle for obstacle in obstacles if not obstacle.collected]
+        if not candidates or not players:
+            return {}
+        candidates.sort(key=self.center_x)
+        centers = [self.center_x(obstacle) for obstacle in candidates]
+        max_half_width = max(obstacle.width // 2 for obstacle in candidates)
+
+        hits = {}
+        for player in players:
+            reach = player.width // 2 + max_half_width
+            player_x = self.center_x(player)
+            start = bisect.bisect_left(centers, player_x - reach)
+            end = bisect.bisect_right(centers, player_x + reach)
+            for obstacle in candidates[start:end]:
+                if obstacle not in hits and obstacle.check_collision(player):
+                    hits[obstacle] = player
+        return hits
+
+
+collisions = CollisionSystem()
+
+achievement_pool = EntityPool(AchievementObstacle)
+
+# Бесконечный режим: волны врагов и достижений без конца, game_speed растет с
+# каждым шагом и задает скорость и частоту волн, касание врага сбивает скорость
+ENDLESS_BASE_SPEED = 6
+ENDLESS_ACCELERATION = 0.0005  # +1.0 к game_speed примерно за 33 секунды
+ENDLESS_MAX_SPEED = 3.0
+ENDLESS_HIT_SLOWDOWN = 0.5
+ENDLESS_WAVE_INTERVAL = (100, 160)  # шагов между волнами при game_speed 1.0
+ENDLESS_ACHIEVEMENT_CHANCE = 0.25
+ENDLESS_WAVE_GAP = 110  # расстояние между врагами внутри волны
+
+
+# Новогодние данные достижений лежат в assets/achievements.json. При загрузке
+# каждая запись проверяется по схеме и компилируется: обрезанные заголовки,
+# строки текста попапа и цвета типа считаются один раз и кладутся в entry["layout"]
+ACHIEVEMENTS_FILE = "assets/achievements.json"
+
+# Поле: (тип, обязательное)
+ACHIEVEMENT_SCHEMA = {
+    "icon": (str, True),
+    "title": (str, True),
+    "text": (str, True),
+    "stats": (str, True),
+    "type": (str, False),
+    "details": (list, False),
+}
 
+# Цвет значка на финальном экране (у препятствий своя палитра — AchievementObstacle.types)
+FINISH_TYPE_COLORS = {
+    "team": COLORS["success"],
+    "deadline": COLORS["warning"],
+    "product": COLORS["primary"],
+    "refactor": COLORS["success"],
+    "api": COLORS["danger"],
+    "config": COLORS["secondary"],
+    "template": COLORS["secondary"],
+    "automation": COLORS["secondary"],
+    "reuse": COLORS["secondary"]
+}
 
-# Новогодние данные достижений
-achievements_data = [
-    {
-        "icon": "TEAM",
-        "title": "Новогодняя команда",
-        "text": "В команду пришла ценная помощница Алина, которая выжила в суровых сроках и успешно справлялась с ответственными задачами",
-        "stats": "+40% к скорости разработки",
-        "type": "team",
-        "details": [
-            "Новый член команды влился в процессы меньше чем за 2 недели",
-            "Взяла на себя ключевые проекты",
-            "Помогла с рефакторингом"
-        ]
-    },
-    {
-        "icon": "TIME",
-        "title": "Новогодние сроки",
-        "text": "Все проекты были реализованы в срок или даже раньше дедлайнов до Нового года",
-        "stats": "100% соблюдение сроков",
-        "type": "deadline",
-        "details": [
-            "19 проектов завершены вовремя",
-            "3 проекта сданы досрочно",
-            "0 переносов дедлайнов"
-        ]
-    },
-    {
-        "icon": "GIFT",
-        "title": "Подарочный продукт",
-        "text": "Запущен 'Холодильник Выгоды' - новогодний подарок пользователям с постоянным развитием",
-        "stats": "+300% вовлеченности пользователей",
-        "type": "product",
-        "details": [
-            "Архитектура микросервисов",
-            "Реализовано 15+ уникальных фич",
-            "Еженедельные релизы"
-        ]
-    },
-    {
-        "icon": "SNOW",
-        "title": "Снежная уборка кода",
-        "text": "Провели рефакторинг кодовой базы всех проектов как новогоднюю уборку",
-        "stats": "-60% технического долга",
-        "type": "refactor",
-        "details": [
-            "Выделена переиспользуемая библиотека",
-            "Улучшена читаемость кода",
-            "Сокращено время отладки"
-        ]
-    },
-    {
-        "icon": "TREE",
-        "title": "Елочка API",
-        "text": "Разделили монолитный эндпоинт user на независимые ручки как ветки елки",
-        "stats": "+200% скорость ответа API",
-        "type": "api",
-        "details": [
-            "5 независимых эндпоинтов",
-            "Упрощено тестирование",
-            "Улучшена масштабируемость"
-        ]
-    },
-    {
-        "icon": "STAR",
-        "title": "Звездная конфигурация",
-        "text": "Статические данные валидируются на уровне конфигов как звезды на елке",
-        "stats": "-90% продакшн багов",
-        "type": "config",
-        "details": [
-            "Изменение без деплоев",
-            "Ускоренное тестирование",
-            "Предсказуемое поведение"
-        ]
-    },
-    {
-        "icon": "BELL",
-        "title": "Колокольчик шаблонов",
-        "text": "Создан шаблон для реализации проектов как новогодний колокольчик",
-        "stats": "-40% время на старт проекта",
-        "type": "template",
-        "details": [
-            "Стандартизирована структура",
-            "Автоматическая настройка",
-            "Готовые модули"
-        ]
-    },
-    {
-        "icon": "MAGIC",
-        "title": "Новогодняя магия автоматизации",
-        "text": "Автоматическая отправка аналитики в Telegram как новогодние поздравления",
-        "stats": "Ежедневная экономия 2 человеко-часов",
-        "type": "automation",
-        "details": [
-            "Отчеты в реальном времени",
-            "Интеграция со всеми проектами",
-            "Гибкая настройка метрик"
-        ]
-    },
-    {
-        "icon": "CANDY",
-        "title": "Сладкое переиспользование",
-        "text": "Механизм подбора приза переиспользован в проектах как новогодние конфеты",
-        "stats": "Переиспользовано в 5+ проектах",
-        "type": "reuse",
-        "details": [
-            "Универсальное решение",
-            "Простая интеграция",
-            "Гибкая конфигурация"
-        ]
+POPUP_TEXT_WIDTH = 1000
+
+
+def wrap_text(text, font, max_width):
+    return text_layout.wrap(text, font, max_width)
+
+
+# Форма слова для числа: 1 достижение, 2 достижения, 5 достижений
+def plural(count, one, few, many):
+    if count % 10 == 1 and count % 100 != 11:
+        return one
+    if 2 <= count % 10 <= 4 and not 12 <= count % 100 <= 14:
+        return few
+    return many
+
+
+def truncate(text, limit):
+    return text[:limit - 3] + "..." if len(text) > limit else text
+
+
+def validate_achievement(entry, index, path=ACHIEVEMENTS_FILE):
+    if not isinstance(entry, dict):
+        raise ValueError(f"{path}: запись {index} должна быть объектом")
+    for field, (field_type, required) in ACHIEVEMENT_SCHEMA.items():
+        if field not in entry:
+            if required:
+                raise ValueError(f"{path}: в записи {index} нет поля '{field}'")
+            continue
+        if not isinstance(entry[field], field_type):
+            raise ValueError(f"{path}: поле '{field}' записи {index} "
+                             f"должно быть {field_type.__name__}")
+    unknown = set(entry) - set(ACHIEVEMENT_SCHEMA)
+    if unknown:
+        raise ValueError(f"{path}: лишние поля в записи {index}: {', '.join(sorted(unknown))}")
+    achievement_type = entry.get("type", "product")
+    if achievement_type not in AchievementObstacle.types:
+        raise ValueError(f"{path}: неизвестный тип '{achievement_type}' в записи {index}")
+    if not all(isinstance(detail, str) for detail in entry.get("details", [])):
+        raise ValueError(f"{path}: details записи {index} должны быть строками")
+
+
+def compile_achievement(entry):
+    achievement_type = entry.get("type", "product")
+    entry["layout"] = {
+        "popup_title": truncate(entry["title"], 30),
+        "finish_title": truncate(entry["title"], 35),
+        "lines": wrap_text(entry["text"], font_medium, POPUP_TEXT_WIDTH),
+        "color": AchievementObstacle.types[achievement_type],
+        "finish_color": FINISH_TYPE_COLORS.get(achievement_type, COLORS["primary"]),
     }
-]
+    return entry
+
+
+def load_achievements(path=ACHIEVEMENTS_FILE):
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: ожидается список достижений")
+    for index, entry in enumerate(entries):
+        validate_achievement(entry, index, path)
+    return [compile_achievement(entry) for entry in entries]
+
+
+achievements_data = load_achievements()
+
+# Попап достижения: показывается ACHIEVEMENT_SHOW_STEPS шагов, первые
+# POPUP_INTRO_STEPS из них выезжает сверху на POPUP_SLIDE пикселей и проявляется
+# (0 — появляется сразу)
+ACHIEVEMENT_SHOW_STEPS = 60
+POPUP_WIDTH, POPUP_HEIGHT = 1200, 400
+POPUP_POS = (WIDTH // 2 - POPUP_WIDTH // 2, 50)
+POPUP_INTRO_STEPS = 12
+POPUP_SLIDE = 40
 
 
 class Game:
-    def __init__(self):
+    # rng — генератор NumPy для всей случайности игры, clock — источник времени симуляции.
+    # С сидированным rng и FrameClock игра полностью детерминирована.
+    # endless — бесконечный режим вместо прохождения achievements_data
+    def __init__(self, rng=None, clock=None, endless=False):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.clock = clock if clock is not None else FrameClock(SIMULATION_RATE)
+        self.endless = endless
         self.state = GameState.MENU
         center_x = WIDTH // 2
         center_y = HEIGHT // 2
 
-        self.dev1 = Developer(center_x - 80, center_y, COLORS["dev1"], "Артем", "SANTA")
-        self.dev2 = Developer(center_x + 80, center_y, COLORS["dev2"], "Алина", "Snow_Girl")
+        self.dev1 = Developer(center_x - 80, center_y, COLORS["dev1"], "Артем", "SANTA", rng=self.rng)
+        self.dev2 = Developer(center_x + 80, center_y, COLORS["dev2"], "Алина", "Snow_Girl", rng=self.rng)
         self.selected_dev = self.dev1
         self.obstacles = []
+        self.hazards = []
+        self.hazard_hits = 0
         self.current_achievement = 0
         self.achievement_display = None
         self.achievement_method = None
@@ -641,31 +1809,91 @@ class Game:
         self.timer = 0
         self.spawn_timer = 0
         self.game_speed = 1.0
-        self.particles = []
+        self.particles = ParticleSystem(capacity=256, rng=self.rng)
         self.collected_achievements = []
         self.jump_notifications = []
-
-        self.stars = []
-        for _ in range(120):
-            self.stars.append([
-                random.randint(0, WIDTH),
-                random.randint(0, HEIGHT),
-                random.uniform(0.3, 1.0),
-                random.randint(15, 35)
-            ])
+        self.display_progress = 0
+        self.hud_layer = None
+        self.hud_layer_key = None
+        self.presented_hud_key = None
+        self.popup_surface = None
+        self.popup_surface_key = None
+        self.finish_panel = None
+        self.presented_frame_key = None
+        self.drawn_rects = []
+        self.render_alpha = 1.0
+        # У снега свой генератор от rng игры: сколько снежинок вернулось наверх,
+        # не влияет на случайность препятствий
+        self.snow = Snowfall(rng=np.random.default_rng(self.rng.integers(2 ** 63)))
+
+    # Рестарт продолжает тот же rng и часы, поэтому прогон с сидом остается воспроизводимым
+    def restart(self):
+        for obstacle in self.obstacles:
+            achievement_pool.release(obstacle)
+        for hazard in self.hazards:
+            obstacle_pool.release(hazard)
+        for notification in self.jump_notifications:
+            notification_pool.release(notification)
+        self.__init__(self.rng, self.clock, self.endless)
+
+    # Старт из меню: тот же режим продолжает прерванную игру, другой режим
+    # начинает новую (из бесконечного по ПРОБЕЛУ — снова обычная игра)
+    def start(self, endless):
+        if self.endless != endless:
+            self.endless = endless
+            self.restart()
+        self.state = GameState.PLAYING
+
+    # Один шаг без отрисовки: события, затем update
+    def step(self, events=()):
+        for event in events:
+            self.handle_event(event)
+        self.update()
 
     def spawn_obstacle(self):
-        if self.current_achievement < len(achievements_data) and self.spawn_timer <= 0:
-            obstacle = AchievementObstacle(achievements_data[self.current_achievement],
-                                           x_offset=self.current_achievement * 100)
+        if self.endless:
+            self.spawn_wave()
+        elif self.current_achievement < len(achievements_data) and self.spawn_timer <= 0:
+            obstacle = achievement_pool.acquire(achievements_data[self.current_achievement],
+                                                x_offset=self.current_achievement * 100,
+                                                rng=self.rng)
             self.obstacles.append(obstacle)
             self.current_achievement += 1
-            self.spawn_timer = random.randint(150, 200)
+            self.spawn_timer = int(self.rng.integers(150, 201))
+
+    # Волна бесконечного режима: одно достижение (по кругу из achievements_data)
+    # или группа врагов, тем больше и чаще, чем выше game_speed
+    def spawn_wave(self):
+        if self.spawn_timer > 0:
+            return
+
+        speed = ENDLESS_BASE_SPEED * self.game_speed
+        if self.rng.random() < ENDLESS_ACHIEVEMENT_CHANCE:
+            achievement = achievements_data[self.current_achievement % len(achievements_data)]
+            self.obstacles.append(achievement_pool.acquire(achievement, rng=self.rng, speed=speed))
+            self.current_achievement += 1
+        else:
+            count = 1 + int(self.rng.integers(0, int(self.game_speed) + 1))
+            y = self.dev1.start_y + self.dev1.height - 80
+            for i in range(count):
+                x = WIDTH + 150 + i * ENDLESS_WAVE_GAP
+                self.hazards.append(obstacle_pool.acquire(x, y, speed, rng=self.rng))
+
+        low, high = ENDLESS_WAVE_INTERVAL
+        self.spawn_timer = int(self.rng.integers(low, high + 1) / self.game_speed)
+
+    # Очки за перепрыгивание: всплывающая надпись над игроками и искры
+    def add_score_notification(self, points):
+        notification_x = (self.dev1.x + self.dev2.x) // 2
+        notification_y = min(self.dev1.y, self.dev2.y) - 50
+        self.jump_notifications.append(notification_pool.acquire(notification_x, notification_y, points))
+
+        self.particles.emit(notification_x, notification_y + 20, COLORS["success"], 15)
 
     def show_achievement(self, achievement, method="collected"):
         self.achievement_display = achievement
         self.achievement_method = method
-        self.display_timer = 60
+        self.display_timer = ACHIEVEMENT_SHOW_STEPS
 
         if method == "collected":
             self.score += 100
@@ -680,17 +1908,16 @@ class Game:
             COLORS["snow"],
             COLORS["warning"]
         ]
-        for _ in range(40):
-            self.particles.append(Particle(
-                random.randint(200, 1000),
-                random.randint(100, 200),
-                random.choice(christmas_colors)
-            ))
+        self.particles.emit_scattered((200, 1000), (100, 200), christmas_colors, 40)
 
+    @profiled("update")
     def update(self):
         if self.state not in [GameState.PLAYING, GameState.ACHIEVEMENT_SHOW]:
             return
 
+        self.save_previous_positions()
+        self.clock.advance()
+        ticks = self.clock.ticks()
         self.timer += 1
         self.spawn_timer -= 1
 
@@ -698,30 +1925,33 @@ class Game:
             self.dev1.update()
             self.dev2.update()
 
-        for star in self.stars:
-            star[1] += star[2] * 3
-            star[0] += math.sin(pygame.time.get_ticks() * 0.001 + star[0]) * 0.5
-            if star[1] > HEIGHT:
-                star[1] = -star[3]
-                star[0] = random.randint(0, WIDTH)
+        self.snow.update(ticks)
+
+        if self.endless:
+            self.game_speed = min(ENDLESS_MAX_SPEED, self.game_speed + ENDLESS_ACCELERATION)
 
         self.spawn_obstacle()
 
-        for obstacle in self.obstacles[:]:
-            if obstacle.update():
-                self.obstacles.remove(obstacle)
-            elif not obstacle.collected and not obstacle.passed:
-                collected_by = None
+        remaining = []
+        for obstacle in self.obstacles:
+            if obstacle.update(ticks):
+                achievement_pool.release(obstacle)
+            else:
+                remaining.append(obstacle)
+        self.obstacles = remaining
+
+        if self.hazards:
+            self.update_hazards(ticks)
+
+        hits = collisions.find_hits(self.obstacles, [self.dev1, self.dev2])
+
+        for obstacle in self.obstacles:
+            if not obstacle.collected and not obstacle.passed:
+                collected_by = hits.get(obstacle)
                 method = None
-                if obstacle.check_collision(self.dev1):
-                    obstacle.collected = True
-                    obstacle.create_collect_particles()
-                    collected_by = self.dev1
-                    method = "collected"
-                elif obstacle.check_collision(self.dev2):
+                if collected_by:
                     obstacle.collected = True
                     obstacle.create_collect_particles()
-                    collected_by = self.dev2
                     method = "collected"
 
                 if not collected_by and obstacle.x + obstacle.width < min(self.dev1.x, self.dev2.x):
@@ -735,19 +1965,14 @@ class Game:
 
                     self.jump_score += 50
                     self.score += 50
-
-                    notification_x = (self.dev1.x + self.dev2.x) // 2
-                    notification_y = min(self.dev1.y, self.dev2.y) - 50
-                    self.jump_notifications.append(JumpNotification(notification_x, notification_y, 50))
-
-                    for _ in range(15):
-                        self.particles.append(Particle(
-                            notification_x,
-                            notification_y + 20,
-                            COLORS["success"]
-                        ))
-
-                if collected_by:
+                    self.add_score_notification(50)
+
+                if collected_by and self.endless:
+                    # В бесконечном режиме достижение — просто бонус, без попапа и паузы
+                    if method == "collected":
+                        self.score += 100
+                        self.add_score_notification(100)
+                elif collected_by:
                     self.show_achievement(obstacle.data, method)
                     collected_by.collected.append(obstacle.data)
                     self.collected_achievements.append({
@@ -763,173 +1988,195 @@ class Game:
                 if self.display_timer <= 0:
                     self.state = GameState.ACHIEVEMENT_WAIT
 
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.is_dead():
-                self.particles.remove(particle)
+        self.particles.update()
 
-        for notification in self.jump_notifications[:]:
+        alive = []
+        for notification in self.jump_notifications:
             notification.update()
             if notification.is_dead():
-                self.jump_notifications.remove(notification)
+                notification_pool.release(notification)
+            else:
+                alive.append(notification)
+        self.jump_notifications = alive
 
-        if (len(self.dev1.collected) + len(self.dev2.collected) >= len(achievements_data) and
+        if (not self.endless and
+                len(self.dev1.collected) + len(self.dev2.collected) >= len(achievements_data) and
                 len(self.obstacles) == 0):
             self.state = GameState.FINISHED
 
-    def draw_background(self):
-        if background_image:
-            scaled_bg = pygame.transform.scale(background_image, (WIDTH, HEIGHT))
-            screen.blit(scaled_bg, (0, 0))
-        else:
-            for y in range(HEIGHT):
-                color_value = int(10 + (y / HEIGHT) * 20)
-                pygame.draw.line(screen, (color_value, color_value + 5, color_value + 30),
-                                 (0, y), (WIDTH, y))
-
-        for x, y, brightness, size in self.stars:
-            if snowflake_image:
-                scaled_snowflake = pygame.transform.scale(snowflake_image, (size, size))
-                screen.blit(scaled_snowflake, (x - size // 2, y - size // 2))
+    # Враги бесконечного режима: перепрыгнул — очки, задел — скорость падает
+    def update_hazards(self, ticks):
+        remaining = []
+        for hazard in self.hazards:
+            if hazard.update(ticks):
+                obstacle_pool.release(hazard)
             else:
-                alpha = int(200 * brightness)
-                s = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(s, (*COLORS["snow"], alpha), (size, size), size)
-                screen.blit(s, (x - size, y - size))
+                remaining.append(hazard)
+        self.hazards = remaining
+
+        hits = collisions.find_hits(self.hazards, [self.dev1, self.dev2])
+        for hazard in self.hazards:
+            if hazard in hits:
+                hazard.collected = True
+                self.hazard_hits += 1
+                self.game_speed = max(1.0, self.game_speed - ENDLESS_HIT_SLOWDOWN)
+                self.particles.emit(hazard.x + hazard.width // 2, hazard.y + hazard.height // 2,
+                                    COLORS["danger"], 20)
+            elif (not hazard.collected and not hazard.passed and
+                  hazard.x + hazard.width < min(self.dev1.x, self.dev2.x)):
+                hazard.passed = True
+                self.jump_score += 50
+                self.score += 50
+                self.add_score_notification(50)
+
+    # На низких уровнях качества рисуется только часть снежинок
+    def visible_stars(self):
+        return self.snow.visible(quality.settings["snowflakes"])
+
+    @profiled("background")
+    def draw_background(self):
+        screen.blit(background_layer.get(screen.get_size(), assets.get("background")), (0, 0))
 
-    def draw_ui(self):
-        pygame.draw.rect(screen, (*COLORS["ui_bg"][:3], 120), (20, 20, 240, 200), 0, 10)
+        sprites = snowflake_atlas.get_sprites(assets.get("snowflake"))
+        # Снежинка за шаг падает на brightness * 3 — откатываем на недостающую долю шага
+        lag = (1.0 - self.render_alpha) * 3
+        blit_batch(screen, self.snow.blit_sequence(sprites, self.visible_stars(), lag))
+
+    # Ключ HUD: слой пересобирается только когда меняется что-то из этого
+    def hud_key(self):
+        recent = (self.dev1.collected[-2:] + self.dev2.collected[-2:])[-2:]
+        return (self.score, self.jump_score,
+                len(self.dev1.collected), len(self.dev2.collected),
+                tuple(achievement["title"] for achievement in recent),
+                self.endless and round(self.game_speed, 1))
 
-        title = font_medium.render("Новогодняя Backend", True, COLORS["primary"])
-        screen.blit(title, (40, 40))
+    def build_hud_layer(self):
+        # Панели рисуются непрозрачными, как и раньше на экране без альфа-канала
+        panel_color = COLORS["ui_bg"][:3]
 
-        title = font_medium.render("Odyssey 2025", True, COLORS["primary"])
-        screen.blit(title, (40, 60))
+        left_panel = pygame.Surface((320, 200), pygame.SRCALPHA)
+        pygame.draw.rect(left_panel, panel_color, (0, 0, 240, 200), 0, 10)
 
-        score_text = font_small.render(f"Общий счет: {self.score}", True, COLORS["text"])
-        screen.blit(score_text, (40, 90))
+        title = render_text(font_medium, "Новогодняя Backend", True, COLORS["primary"])
+        left_panel.blit(title, (20, 20))
 
-        jump_score_text = font_small.render(f"За прыжки: {self.jump_score}", True, COLORS["success"])
-        screen.blit(jump_score_text, (40, 115))
+        title = render_text(font_medium, "Odyssey 2025", True, COLORS["primary"])
+        left_panel.blit(title, (20, 40))
 
-        collected = len(self.dev1.collected) + len(self.dev2.collected)
-        total = len(achievements_data)
-        progress_text = font_small.render(f"Прогресс: {collected}/{total}", True, COLORS["text"])
-        screen.blit(progress_text, (40, 140))
+        score_text = render_text(font_small, f"Общий счет: {self.score}", True, COLORS["text"])
+        left_panel.blit(score_text, (20, 70))
 
-        progress_width = 200
-        target_progress = collected / total if total > 0 else 0
-        self.display_progress = getattr(self, "display_progress", 0)
-        self.display_progress += (target_progress - self.display_progress) * 0.1
-        pygame.draw.rect(screen, COLORS["success"],
-                         (40, 160, progress_width * self.display_progress, 12), 0, 6)
+        jump_score_text = render_text(font_small, f"За прыжки: {self.jump_score}", True, COLORS["success"])
+        left_panel.blit(jump_score_text, (20, 95))
+
+        if self.endless:
+            progress_text = render_text(font_small, f"Скорость: x{self.game_speed:.1f}", True, COLORS["text"])
+        else:
+            collected = len(self.dev1.collected) + len(self.dev2.collected)
+            total = len(achievements_data)
+            progress_text = render_text(font_small, f"Прогресс: {collected}/{total}", True, COLORS["text"])
+        left_panel.blit(progress_text, (20, 120))
 
-        controls_y = HEIGHT - 250
         controls = [
             "Управление:",
             "ПРОБЕЛ - Прыжок (оба сразу)",
             "ENTER - Продолжить",
             "R - Рестарт",
             "ESC - Выход",
+            "E - Бесконечный режим (в меню)",
             "",
             "Очки:",
             "+50 за перепрыгивание",
             "+150 за касание"
         ]
 
+        controls_panel = pygame.Surface((300, len(controls) * 25), pygame.SRCALPHA)
         for i, text in enumerate(controls):
-            control_text = font_xsmall.render(text, True, COLORS["text_secondary"])
-            screen.blit(control_text, (WIDTH - 300, controls_y + i * 25))
+            control_text = render_text(font_xsmall, text, True, COLORS["text_secondary"])
+            controls_panel.blit(control_text, (0, i * 25))
 
-        pygame.draw.rect(screen, (*COLORS["ui_bg"][:3], 120), (WIDTH - 300, 20, 280, 150), 0, 10)
-        achievements_title = font_small.render("Последние:", True, COLORS["primary"])
-        screen.blit(achievements_title, (WIDTH - 280, 40))
+        recent_panel = pygame.Surface((300, 150), pygame.SRCALPHA)
+        pygame.draw.rect(recent_panel, panel_color, (0, 0, 280, 150), 0, 10)
+        achievements_title = render_text(font_small, "Последние:", True, COLORS["primary"])
+        recent_panel.blit(achievements_title, (20, 20))
 
         recent = (self.dev1.collected[-2:] + self.dev2.collected[-2:])[-2:]
         for i, achievement in enumerate(recent[::-1]):
             if i < 2:
-                achievement_text = font_xsmall.render(f"• {achievement['title']}",
-                                                      True, COLORS["text"])
-                screen.blit(achievement_text, (WIDTH - 280, 70 + i * 30))
-
-    def wrap_text(self, text, font, max_width):
-        words = text.split(' ')
-        lines = []
-        current_line = []
-
-        for word in words:
-            current_line.append(word)
-            line_width = font.size(' '.join(current_line))[0]
-
-            if line_width > max_width:
-                if len(current_line) == 1:
-                    lines.append(' '.join(current_line))
-                    current_line = []
-                else:
-                    current_line.pop()
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-
-        if current_line:
-            lines.append(' '.join(current_line))
-
-        return lines
-
-    def draw_achievement_popup(self):
-        if not self.achievement_display:
-            return
+                achievement_text = render_text(font_xsmall, f"• {achievement['title']}",
+                                               True, COLORS["text"])
+                recent_panel.blit(achievement_text, (20, 50 + i * 30))
+
+        return [
+            (left_panel.convert_alpha(), (20, 20)),
+            (controls_panel.convert_alpha(), (WIDTH - 300, HEIGHT - 250)),
+            (recent_panel.convert_alpha(), (WIDTH - 300, 20)),
+        ]
 
-        popup_width = 1200
-        popup_height = 400
-        popup_x = WIDTH // 2 - popup_width // 2
-        popup_y = 50
+    @profiled("ui")
+    def draw_ui(self):
+        hud_key = self.hud_key()
+        if self.hud_layer is None or self.hud_layer_key != hud_key:
+            self.hud_layer = self.build_hud_layer()
+            self.hud_layer_key = hud_key
+        blit_batch(screen, self.hud_layer)
+
+        # Анимированная полоска прогресса рисуется поверх готового слоя,
+        # в бесконечном режиме она показывает скорость
+        progress_width = 200
+        if self.endless:
+            target_progress = (self.game_speed - 1.0) / (ENDLESS_MAX_SPEED - 1.0)
+        else:
+            collected = len(self.dev1.collected) + len(self.dev2.collected)
+            total = len(achievements_data)
+            target_progress = collected / total if total > 0 else 0
+        self.display_progress += (target_progress - self.display_progress) * 0.1
+        pygame.draw.rect(screen, COLORS["success"],
+                         (40, 160, progress_width * self.display_progress, 12), 0, 6)
 
-        s = pygame.Surface((popup_width, popup_height), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 220))
-        screen.blit(s, (popup_x, popup_y))
+    # Содержимое попапа не меняется, пока не сменится достижение, способ или состояние
+    def popup_key(self):
+        return (id(self.achievement_display), self.achievement_method, self.state)
 
-        pygame.draw.rect(screen, COLORS["primary"],
-                         (popup_x, popup_y, popup_width, popup_height), 3, 10)
+    def build_popup_surface(self):
+        achievement = self.achievement_display
+        layout = achievement["layout"]
 
-        icon = title_font.render(self.achievement_display["icon"], True, COLORS["primary"])
-        title_text = self.achievement_display["title"]
-        if len(title_text) > 30:
-            title_text = title_text[:27] + "..."
-        title = title_font.render(title_text, True, COLORS["success"])
+        popup = pygame.Surface((POPUP_WIDTH, POPUP_HEIGHT), pygame.SRCALPHA)
+        popup.fill((0, 0, 0, 220))
+        pygame.draw.rect(popup, COLORS["primary"], (0, 0, POPUP_WIDTH, POPUP_HEIGHT), 3, 10)
 
-        screen.blit(icon, (popup_x + 30, popup_y + 25))
-        screen.blit(title, (popup_x + 130, popup_y + 25))
+        icon = render_text(title_font, achievement["icon"], True, COLORS["primary"])
+        title = render_text(title_font, layout["popup_title"], True, COLORS["success"])
+        popup.blit(icon, (30, 25))
+        popup.blit(title, (130, 25))
 
-        text_lines = self.wrap_text(self.achievement_display["text"], font_medium, 1000)
-        for i, line in enumerate(text_lines[:3]):
-            text = font_medium.render(line, True, COLORS["text"])
-            screen.blit(text, (popup_x + 30, popup_y + 90 + i * 30))
+        for i, line in enumerate(layout["lines"][:3]):
+            text = render_text(font_medium, line, True, COLORS["text"])
+            popup.blit(text, (30, 90 + i * 30))
 
-        stats = font_medium.render(self.achievement_display["stats"], True, COLORS["secondary"])
-        screen.blit(stats, (popup_x + 30, popup_y + 200))
+        stats = render_text(font_medium, achievement["stats"], True, COLORS["secondary"])
+        popup.blit(stats, (30, 200))
 
-        if hasattr(self, 'achievement_method') and self.achievement_method:
+        if self.achievement_method:
             method_text = "Получено касанием (+150 очков)" if self.achievement_method == "collected" else "Получено перепрыгиванием (+50 очков)"
             method_color = COLORS["success"] if self.achievement_method == "collected" else COLORS["warning"]
-            method_render = font_small.render(method_text, True, method_color)
-            screen.blit(method_render, (popup_x + 30, popup_y + 230))
+            method_render = render_text(font_small, method_text, True, method_color)
+            popup.blit(method_render, (30, 230))
 
-        if "details" in self.achievement_display:
-            details_title = font_medium.render("Детали:", True, COLORS["warning"])
-            screen.blit(details_title, (popup_x + 30, popup_y + 260))
+        if "details" in achievement:
+            details_title = render_text(font_medium, "Детали:", True, COLORS["warning"])
+            popup.blit(details_title, (30, 260))
 
-            for i, detail in enumerate(self.achievement_display["details"][:2]):
-                detail_text = f"• {detail}"
-                detail_render = font_small.render(detail_text, True, COLORS["text_secondary"])
-                screen.blit(detail_render, (popup_x + 50, popup_y + 290 + i * 25))
+            for i, detail in enumerate(achievement["details"][:2]):
+                detail_render = render_text(font_small, f"• {detail}", True, COLORS["text_secondary"])
+                popup.blit(detail_render, (50, 290 + i * 25))
 
         if self.state == GameState.ACHIEVEMENT_WAIT:
-            continue_text = font_large.render("Нажмите ENTER для продолжения", True, COLORS["warning"])
-            screen.blit(continue_text, (popup_x + popup_width // 2 - continue_text.get_width() // 2,
-                                        popup_y + 350))
+            footer = render_text(font_large, "Нажмите ENTER для продолжения", True, COLORS["warning"])
         else:
-            dev1_has = any(ach["title"] == self.achievement_display["title"] for ach in self.dev1.collected)
-            dev2_has = any(ach["title"] == self.achievement_display["title"] for ach in self.dev2.collected)
+            dev1_has = any(ach["title"] == achievement["title"] for ach in self.dev1.collected)
+            dev2_has = any(ach["title"] == achievement["title"] for ach in self.dev2.collected)
 
             if dev1_has and dev2_has:
                 collected_by = "Оба разработчика"
@@ -938,9 +2185,39 @@ class Game:
             else:
                 collected_by = "Разработчик"
 
-            collector_text = font_medium.render(f"Собрано: {collected_by}", True, COLORS["text_secondary"])
-            screen.blit(collector_text, (popup_x + popup_width // 2 - collector_text.get_width() // 2,
-                                         popup_y + 350))
+            footer = render_text(font_medium, f"Собрано: {collected_by}", True, COLORS["text_secondary"])
+        popup.blit(footer, (POPUP_WIDTH // 2 - footer.get_width() // 2, 350))
+
+        return popup.convert_alpha()
+
+    # Доля появления попапа: от 0 до 1 за первые POPUP_INTRO_STEPS шагов показа
+    def popup_intro(self):
+        if self.state != GameState.ACHIEVEMENT_SHOW or POPUP_INTRO_STEPS <= 0:
+            return 1.0
+        return min(1.0, (ACHIEVEMENT_SHOW_STEPS - self.display_timer) / POPUP_INTRO_STEPS)
+
+    def popup_rect(self):
+        x, y = POPUP_POS
+        return pygame.Rect(x, y - POPUP_SLIDE, POPUP_WIDTH, POPUP_HEIGHT + POPUP_SLIDE)
+
+    @profiled("popup")
+    def draw_achievement_popup(self):
+        if not self.achievement_display:
+            return
+
+        popup_key = self.popup_key()
+        if self.popup_surface is None or self.popup_surface_key != popup_key:
+            self.popup_surface = self.build_popup_surface()
+            self.popup_surface_key = popup_key
+
+        x, y = POPUP_POS
+        intro = self.popup_intro()
+        if intro < 1.0:
+            self.popup_surface.set_alpha(int(255 * intro))
+            screen.blit(self.popup_surface, (x, y - int(POPUP_SLIDE * (1.0 - intro))))
+            self.popup_surface.set_alpha(255)
+        else:
+            screen.blit(self.popup_surface, (x, y))
 
     def draw_menu(self):
         self.draw_background()
@@ -955,8 +2232,8 @@ class Game:
         pygame.draw.rect(screen, COLORS["primary"],
                          (panel_x, panel_y, panel_width, panel_height), 3, 20)
 
-        title = title_font.render("НОВОГОДНЯЯ BACKEND ODYSSEY 2025", True, COLORS["primary"])
-        subtitle = font_large.render("Год прорывов и новогодних достижений", True, COLORS["text"])
+        title = render_text(title_font, "НОВОГОДНЯЯ BACKEND ODYSSEY 2025", True, COLORS["primary"])
+        subtitle = render_text(font_large, "Год прорывов и новогодних достижений", True, COLORS["text"])
 
         screen.blit(title, (WIDTH // 2 - title.get_width() // 2, panel_y + 40))
         screen.blit(subtitle, (WIDTH // 2 - subtitle.get_width() // 2, panel_y + 100))
@@ -968,51 +2245,66 @@ class Game:
         ]
 
         for i, line in enumerate(description):
-            desc_text = font_medium.render(line, True, COLORS["text_secondary"])
+            desc_text = render_text(font_medium, line, True, COLORS["text_secondary"])
             screen.blit(desc_text, (WIDTH // 2 - desc_text.get_width() // 2, panel_y + 160 + i * 35))
 
         button_rect = pygame.Rect(WIDTH // 2 - 150, panel_y + 320, 300, 50)
         pygame.draw.rect(screen, COLORS["primary"], button_rect, 0, 10)
         pygame.draw.rect(screen, COLORS["text"], button_rect, 2, 10)
 
-        start_text = font_large.render("НАЧАТЬ ПУТЕШЕСТВИЕ", True, COLORS["text"])
+        start_text = render_text(font_large, "НАЧАТЬ ПУТЕШЕСТВИЕ", True, COLORS["text"])
         screen.blit(start_text, (WIDTH // 2 - start_text.get_width() // 2, panel_y + 335))
 
-        hint = font_small.render("Нажмите ПРОБЕЛ для начала", True, COLORS["text_secondary"])
+        hint = render_text(font_small, "ПРОБЕЛ - обычная игра, E - бесконечный режим",
+                           True, COLORS["text_secondary"])
         screen.blit(hint, (WIDTH // 2 - hint.get_width() // 2, panel_y + 380))
 
-        return button_rect
+        if not assets.ready:
+            self.draw_loading_progress(panel_y + panel_height + 30)
 
-    def draw_finish_screen(self):
-        self.draw_background()
+        return button_rect
 
+    def draw_loading_progress(self, y):
+        bar_width = 400
+        bar_x = WIDTH // 2 - bar_width // 2
+        loading_text = render_text(font_small, f"Загрузка ресурсов: {assets.loaded}/{assets.total}",
+                                   True, COLORS["text_secondary"])
+        screen.blit(loading_text, (WIDTH // 2 - loading_text.get_width() // 2, y))
+        pygame.draw.rect(screen, COLORS["dark_bg"], (bar_x, y + 30, bar_width, 12), 0, 6)
+        pygame.draw.rect(screen, COLORS["success"],
+                         (bar_x, y + 30, bar_width * assets.progress, 12), 0, 6)
+
+    # Итог по collected_achievements: сколько собрано, за сколько и как —
+    # касанием или прыжком (в обычной игре к финишу собраны все, доля всех не нужна)
+    def finish_summary(self):
+        collected = len(self.collected_achievements)
+        touched = sum(1 for entry in self.collected_achievements if entry["method"] == "collected")
+        minutes, seconds = divmod(self.timer // SIMULATION_RATE, 60)
+        return (f"Собрано: {collected} {plural(collected, 'достижение', 'достижения', 'достижений')} | "
+                f"Время: {minutes}:{seconds:02d} | Касанием: {touched}, прыжком: {collected - touched}")
+
+    # Панель финального экрана статична: собирается один раз при первом кадре
+    # в FINISHED (restart сбрасывает её вместе со всей игрой)
+    def build_finish_panel(self):
         panel_width = 1300
         panel_height = 700
-        panel_x = WIDTH // 2 - panel_width // 2
-        panel_y = 20
+        panel = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
 
-        pygame.draw.rect(
-            screen, (*COLORS["ui_bg"][:3], 240),
-            (panel_x, panel_y, panel_width, panel_height), 0, 20
-        )
-        pygame.draw.rect(
-            screen, COLORS["primary"],
-            (panel_x, panel_y, panel_width, panel_height), 3, 20
-        )
+        # Панель непрозрачная, как и раньше на экране без альфа-канала
+        pygame.draw.rect(panel, COLORS["ui_bg"][:3], (0, 0, panel_width, panel_height), 0, 20)
+        pygame.draw.rect(panel, COLORS["primary"], (0, 0, panel_width, panel_height), 3, 20)
 
-        congrats = title_font.render("🎉 ВСЕ НОВОГОДНИЕ ДОСТИЖЕНИЯ 2025! 🎉", True, COLORS["success"])
-        screen.blit(congrats, (WIDTH // 2 - congrats.get_width() // 2, panel_y + 20))
+        congrats = render_text(title_font, "🎉 ВСЕ НОВОГОДНИЕ ДОСТИЖЕНИЯ 2025! 🎉", True, COLORS["success"])
+        panel.blit(congrats, (panel_width // 2 - congrats.get_width() // 2, 20))
 
-        pygame.draw.line(screen, COLORS["primary"],
-                         (panel_x + 50, panel_y + 100),
-                         (panel_x + panel_width - 50, panel_y + 100), 2)
+        pygame.draw.line(panel, COLORS["primary"], (50, 100), (panel_width - 50, 100), 2)
 
-        col1_x = panel_x + 60
-        col2_x = panel_x + panel_width // 2 + 20
-        start_y = panel_y + 120
+        col1_x = 60
+        col2_x = panel_width // 2 + 20
+        start_y = 120
 
-        achievements_title = font_large.render("Все достижения Backend команды 2025:", True, COLORS["warning"])
-        screen.blit(achievements_title, (col1_x, start_y))
+        achievements_title = render_text(font_large, "Все достижения Backend команды 2025:", True, COLORS["warning"])
+        panel.blit(achievements_title, (col1_x, start_y))
 
         achievements_per_column = (len(achievements_data) + 1) // 2
 
@@ -1024,55 +2316,105 @@ class Game:
                 x = col2_x
                 y = start_y + 40 + ((i - achievements_per_column) * 60)
 
-            achievement_type = achievement.get("type", "product")
-            type_colors = {
-                "team": COLORS["success"],
-                "deadline": COLORS["warning"],
-                "product": COLORS["primary"],
-                "refactor": COLORS["success"],
-                "api": COLORS["danger"],
-                "config": COLORS["secondary"],
-                "template": COLORS["secondary"],
-                "automation": COLORS["secondary"],
-                "reuse": COLORS["secondary"]
-            }
-            icon_color = type_colors.get(achievement_type, COLORS["primary"])
-
-            icon_text = font_medium.render(achievement["icon"], True, icon_color)
-            screen.blit(icon_text, (x, y))
-
-            title_text = achievement["title"]
-            if len(title_text) > 35:
-                title_text = title_text[:32] + "..."
-            title_render = font_small.render(title_text, True, COLORS["text"])
-            screen.blit(title_render, (x + 80, y))
-
-            stats_render = font_xsmall.render(achievement["stats"], True, COLORS["success"])
-            screen.blit(stats_render, (x + 40, y + 20))
-
-        stats_y = panel_y + panel_height - 80
-        summary_text = f"Собрано: 9 достижений | Время: 363 дня | Эффективность: 100%"
-        summary_render = font_medium.render(summary_text, True, COLORS["text"])
-        screen.blit(summary_render, (WIDTH // 2 - summary_render.get_width() // 2, stats_y))
-
-        restart_text = font_large.render("Нажмите R для новой игры или ESC для выхода", True, COLORS["warning"])
-        screen.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, panel_y + panel_height - 40))
-
-    def draw(self):
+            layout = achievement["layout"]
+            icon_text = render_text(font_medium, achievement["icon"], True, layout["finish_color"])
+            panel.blit(icon_text, (x, y))
+
+            title_render = render_text(font_small, layout["finish_title"], True, COLORS["text"])
+            panel.blit(title_render, (x + 80, y))
+
+            stats_render = render_text(font_xsmall, achievement["stats"], True, COLORS["success"])
+            panel.blit(stats_render, (x + 40, y + 20))
+
+        summary_render = render_text(font_medium, self.finish_summary(), True, COLORS["text"])
+        panel.blit(summary_render, (panel_width // 2 - summary_render.get_width() // 2, panel_height - 80))
+
+        restart_text = render_text(font_large, "Нажмите R для новой игры или ESC для выхода", True, COLORS["warning"])
+        panel.blit(restart_text, (panel_width // 2 - restart_text.get_width() // 2, panel_height - 40))
+
+        return panel.convert_alpha()
+
+    def draw_finish_screen(self):
+        self.draw_background()
+
+        if self.finish_panel is None:
+            self.finish_panel = self.build_finish_panel()
+        screen.blit(self.finish_panel, (WIDTH // 2 - self.finish_panel.get_width() // 2, 20))
+
+    def particle_systems(self):
+        return ([self.particles, self.dev1.particles, self.dev2.particles] +
+                [obstacle.particles for obstacle in self.obstacles])
+
+    # Запоминаем состояние перед шагом, чтобы отрисовка могла интерполировать
+    def save_previous_positions(self):
+        for developer in (self.dev1, self.dev2):
+            developer.prev_y = developer.y
+        for obstacle in self.obstacles:
+            obstacle.prev_x = obstacle.x
+            obstacle.prev_bounce_offset = obstacle.bounce_offset
+        for hazard in self.hazards:
+            hazard.prev_x = hazard.x
+        for notification in self.jump_notifications:
+            notification.prev_y = notification.y
+        for particles in self.particle_systems():
+            particles.snapshot()
+
+    # На время отрисовки подставляем позиции между двумя последними шагами
+    @contextmanager
+    def interpolated(self, alpha):
+        if alpha >= 1.0 or self.state not in [GameState.PLAYING, GameState.ACHIEVEMENT_SHOW]:
+            yield
+            return
+
+        saved = []
+
+        def lerp(entity, attr, previous):
+            current = getattr(entity, attr)
+            saved.append((entity, attr, current))
+            setattr(entity, attr, previous + (current - previous) * alpha)
+
+        for developer in (self.dev1, self.dev2):
+            lerp(developer, "y", developer.prev_y)
+        for obstacle in self.obstacles:
+            lerp(obstacle, "x", obstacle.prev_x)
+            lerp(obstacle, "bounce_offset", obstacle.prev_bounce_offset)
+        for hazard in self.hazards:
+            lerp(hazard, "x", hazard.prev_x)
+        for notification in self.jump_notifications:
+            lerp(notification, "y", notification.prev_y)
+        for particles in self.particle_systems():
+            saved.append((particles, "render_alpha", particles.render_alpha))
+            particles.render_alpha = alpha
+        saved.append((self, "render_alpha", self.render_alpha))
+        self.render_alpha = alpha
+
+        try:
+            yield
+        finally:
+            for entity, attr, value in saved:
+                setattr(entity, attr, value)
+
+    def draw(self, alpha=1.0):
         if self.state == GameState.MENU:
             self.draw_menu()
         elif self.state in [GameState.PLAYING, GameState.ACHIEVEMENT_SHOW, GameState.ACHIEVEMENT_WAIT]:
-            self.draw_background()
-            for obstacle in self.obstacles:
-                obstacle.draw(screen)
-            self.dev1.draw(screen)
-            self.dev2.draw(screen)
+            with self.interpolated(alpha):
+                self.draw_background()
+                for hazard in self.hazards:
+                    hazard.draw(screen)
+                for obstacle in self.obstacles:
+                    obstacle.draw(screen)
+                self.dev1.draw(screen)
+                self.dev2.draw(screen)
 
-            for particle in self.particles:
-                particle.draw(screen)
+                self.particles.draw(screen)
 
-            for notification in self.jump_notifications:
-                notification.draw(screen)
+                for notification in self.jump_notifications:
+                    notification.draw(screen)
+
+                # Области берутся здесь, пока позиции подставлены: иначе на экран
+                # попадет место после шага, а не то, что нарисовано на самом деле
+                self.drawn_rects = self.world_dirty_rects() if dirty_renderer.enabled else []
 
             self.draw_ui()
 
@@ -1080,33 +2422,95 @@ class Game:
                 self.draw_achievement_popup()
 
             if self.state == GameState.ACHIEVEMENT_WAIT:
-                pause_text = font_medium.render("ИГРА ОСТАНОВЛЕНА", True, COLORS["warning"])
+                pause_text = render_text(font_medium, "ИГРА ОСТАНОВЛЕНА", True, COLORS["warning"])
                 screen.blit(pause_text, (WIDTH // 2 - pause_text.get_width() // 2, HEIGHT - 80))
 
         elif self.state == GameState.FINISHED:
             self.draw_finish_screen()
 
+    # Области игрового мира по текущим (при отрисовке — интерполированным) позициям
+    def world_dirty_rects(self):
+        rects = []
+
+        # Разработчики анимируются при отрисовке (руки, шапка) даже на паузе
+        for developer in (self.dev1, self.dev2):
+            rects.append(developer.get_dirty_rect())
+            rects.append(developer.particles.get_dirty_rect())
+
+        # В ACHIEVEMENT_WAIT update не вызывается: снег, препятствия и частицы стоят на месте
+        if self.state != GameState.ACHIEVEMENT_WAIT:
+            sprites = snowflake_atlas.get_sprites(assets.get("snowflake"))
+            lag = (1.0 - self.render_alpha) * 3
+            rects.extend(self.snow.dirty_rects(sprites, self.visible_stars(), lag))
+
+            for obstacle in self.obstacles:
+                rects.append(obstacle.get_dirty_rect())
+                rects.append(obstacle.particles.get_dirty_rect())
+            for hazard in self.hazards:
+                rects.append(hazard.get_dirty_rect())
+
+            rects.append(self.particles.get_dirty_rect())
+            for notification in self.jump_notifications:
+                rects.append(notification.get_dirty_rect())
+
+        return rects
+
+    # Области кадра, которые могли измениться с прошлого кадра
+    def dirty_rects(self):
+        if self.state not in [GameState.PLAYING, GameState.ACHIEVEMENT_SHOW, GameState.ACHIEVEMENT_WAIT]:
+            return []
+
+        rects = list(self.drawn_rects)
+        if self.achievement_display and self.popup_intro() < 1.0:
+            rects.append(self.popup_rect())
+
+        rects.append(pygame.Rect(40, 160, 200, 12))
+        if self.hud_layer_key != self.presented_hud_key:
+            rects.extend(surface.get_rect(topleft=pos) for surface, pos in self.hud_layer or [])
+            self.presented_hud_key = self.hud_layer_key
+
+        return [rect for rect in rects if rect]
+
+    def present(self, extra_rects=()):
+        # Смена состояния или попапа меняет весь экран — показываем кадр целиком
+        frame_key = (self.state, id(self.achievement_display), assets.version)
+        if frame_key != self.presented_frame_key:
+            dirty_renderer.invalidate()
+            self.presented_frame_key = frame_key
+
+        rects = []
+        if dirty_renderer.enabled:
+            rects = self.dirty_rects() + list(extra_rects)
+        dirty_renderer.present(rects)
+
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_m:
-                global music_playing
-                if music_playing:
-                    pygame.mixer.music.pause()
-                    music_playing = False
-                else:
-                    pygame.mixer.music.unpause()
-                    music_playing = True
+                background_music.toggle()
+
+            elif event.key == pygame.K_F2:
+                dirty_renderer.enabled = not dirty_renderer.enabled
+                dirty_renderer.invalidate()
+
+            elif event.key == pygame.K_F3:
+                profiler.visible = not profiler.visible
+                dirty_renderer.invalidate()
+
+            elif event.key == pygame.K_F4:
+                profiler.dump(time.strftime("profile_%Y%m%d_%H%M%S.json"))
 
             elif self.state == GameState.MENU:
                 if event.key == pygame.K_SPACE:
-                    self.state = GameState.PLAYING
+                    self.start(endless=False)
+                elif event.key == pygame.K_e:
+                    self.start(endless=True)
 
             elif self.state == GameState.PLAYING:
                 if event.key == pygame.K_SPACE:
                     self.dev1.jump(1.0)
                     self.dev2.jump(1.0)
                 elif event.key == pygame.K_r:
-                    self.__init__()
+                    self.restart()
                     self.state = GameState.PLAYING
                 elif event.key == pygame.K_ESCAPE:
                     self.state = GameState.MENU
@@ -1120,31 +2524,94 @@ class Game:
 
             elif self.state == GameState.FINISHED:
                 if event.key == pygame.K_r:
-                    self.__init__()
+                    self.restart()
                     self.state = GameState.PLAYING
                 elif event.key == pygame.K_ESCAPE:
                     self.state = GameState.MENU
                 elif event.key == pygame.K_RETURN:
-                    self.__init__()
+                    self.restart()
                     self.state = GameState.PLAYING
 
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if self.state == GameState.MENU:
                 button_rect = pygame.Rect(WIDTH // 2 - 150, HEIGHT // 2 - 50, 300, 50)
                 if button_rect.collidepoint(event.pos):
-                    self.state = GameState.PLAYING
+                    self.start(endless=False)
 
             elif self.state == GameState.FINISHED:
                 button_rect = pygame.Rect(WIDTH // 2 - 150, HEIGHT // 2 + 150, 300, 45)
                 if button_rect.collidepoint(event.pos):
-                    self.__init__()
+                    self.restart()
                     self.state = GameState.PLAYING
 
 
+# === БЕЗГОЛОВАЯ СИМУЛЯЦИЯ ===
+# Полная сессия без отрисовки: оба прыгают каждые jump_interval кадров,
+# ENTER нажимается сразу после показа достижения. В бесконечном режиме игра идет
+# все max_frames шагов — это заодно прогон на утечки: пулы не должны расти
+def simulate(seed=0, max_frames=20000, jump_interval=40, endless=False):
+    assets.load_all()
+    game = Game(rng=np.random.default_rng(seed), clock=FrameClock(), endless=endless)
+    game.state = GameState.PLAYING
+    space = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+    enter = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN)
+
+    frame = 0
+    while frame < max_frames and game.state != GameState.FINISHED:
+        events = []
+        if frame % jump_interval == 0:
+            events.append(space)
+        if game.state == GameState.ACHIEVEMENT_WAIT:
+            events.append(enter)
+        game.step(events)
+        frame += 1
+
+    result = {
+        "seed": seed,
+        "frames": frame,
+        "state": game.state.name,
+        "score": game.score,
+        "jump_score": game.jump_score,
+        "collected": [(entry["achievement"]["icon"], entry["collected_by"], entry["method"])
+                      for entry in game.collected_achievements],
+    }
+    if endless:
+        result.update({
+            "game_speed": round(game.game_speed, 3),
+            "hazard_hits": game.hazard_hits,
+            "live": len(game.obstacles) + len(game.hazards),
+            "obstacle_pool": obstacle_pool.stats(),
+            "achievement_pool": achievement_pool.stats(),
+            "notification_pool": notification_pool.stats(),
+        })
+    return result
+
+
 # === АСИНХРОННАЯ ФУНКЦИЯ ДЛЯ PYGbag ===
+# Один кадр: сколько нужно шагов симуляции, затем отрисовка с интерполяцией
+# Возвращает области оверлеев для грязных прямоугольников
+def run_frame(game, timestep, elapsed_ms):
+    profiler.next_frame()
+    assets.poll()
+    quality.record(clock.get_rawtime())
+    for _ in range(timestep.advance(elapsed_ms)):
+        game.update()
+    game.draw(timestep.alpha)
+
+    if profiler.visible:
+        return [profiler.draw(screen)]
+
+    fps = render_text(font_xsmall, f"FPS: {int(clock.get_fps())}", True, COLORS["text_secondary"])
+    screen.blit(fps, (10, HEIGHT - 30))
+    return [fps.get_rect(topleft=(10, HEIGHT - 30))]
+
+
 async def main():
+    assets.start()
     game = Game()
+    timestep = FixedTimestep()
     running = True
+    elapsed_ms = 0
 
     while running:
         for event in pygame.event.get():
@@ -1152,25 +2619,28 @@ async def main():
                 running = False
             game.handle_event(event)
 
-        game.update()
-        game.draw()
-
-        # Оригинальный FPS
-        fps = font_xsmall.render(f"FPS: {int(clock.get_fps())}", True, COLORS["text_secondary"])
-        screen.blit(fps, (10, HEIGHT - 30))
+        overlay_rects = run_frame(game, timestep, elapsed_ms)
 
         # Ключевое изменение для PygBag
-        await asyncio.sleep(0)
+        with profiler.idle():
+            await asyncio.sleep(0)
 
-        pygame.display.flip()
-        clock.tick(60)
+        game.present(overlay_rects)
+        profiler.end_frame()
+        background_music.request()
+        elapsed_ms = clock.tick(RENDER_FPS)
 
     pygame.quit()
     sys.exit()
 
 
 # === ДВОЙНАЯ ТОЧКА ВХОДА ===
-if __name__ == "__main__":
+if __name__ == "__main__" and HEADLESS:
+    # Безголовый прогон: python main.py --headless [--endless] [seed]
+    args = [arg for arg in sys.argv[1:] if arg not in ("--headless", "--endless")]
+    print(simulate(seed=int(args[0]) if args else 0, endless="--endless" in sys.argv))
+
+elif __name__ == "__main__":
     # Для обычного запуска: python main.py
     # Для PygBag: asyncio.run(main())
 
@@ -1182,8 +2652,11 @@ if __name__ == "__main__":
         asyncio.run(main())
     except ImportError:
         # Запускаем обычную синхронную версию
+        assets.start()
         game = Game()
+        timestep = FixedTimestep()
         running = True
+        elapsed_ms = 0
 
         while running:
             for event in pygame.event.get():
@@ -1191,14 +2664,12 @@ if __name__ == "__main__":
                     running = False
                 game.handle_event(event)
 
-            game.update()
-            game.draw()
+            overlay_rects = run_frame(game, timestep, elapsed_ms)
 
-            fps = font_xsmall.render(f"FPS: {int(clock.get_fps())}", True, COLORS["text_secondary"])
-            screen.blit(fps, (10, HEIGHT - 30))
-
-            pygame.display.flip()
-            clock.tick(60)
+            game.present(overlay_rects)
+            profiler.end_frame()
+            background_music.request()
+            elapsed_ms = clock.tick(RENDER_FPS)
 
         pygame.quit()
         sys.exit()
\ No newline at end of file